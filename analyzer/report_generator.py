@@ -4,17 +4,64 @@ Generate reports from auction item data
 
 import os
 import time
-import pandas as pd
+import traceback
+from functools import lru_cache
 from urllib.parse import quote_plus
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.styles.numbers import FORMAT_CURRENCY_USD_SIMPLE
 
-from config import OUTPUT_DIR, AUCTION_URL, OPENROUTER_ENABLED
+try:
+    # Rust-backed writer; much faster than openpyxl for the bulk data path
+    from rustpy_xlsxwriter import FastExcel, Format
+except ImportError:
+    FastExcel = None
+
+from config import OUTPUT_DIR, AUCTION_URL, AUCTION_SLUG, OPENROUTER_ENABLED
 from utils.logger import setup_logger
 
 # Set up logger
 logger = setup_logger("ReportGenerator")
 
+# pandas and openpyxl are imported inside the report functions, so importing this
+# module (e.g. from main.py) stays cheap when no report ends up being generated
+# Currency is openpyxl's FORMAT_CURRENCY_USD_SIMPLE, spelled out to keep openpyxl off the import path
+NUMBER_FORMATS = {'currency': '"$"#,##0.00_-', 'percentage': '0.00"%"'}
+
+@lru_cache(maxsize=None)
+def _openpyxl_styles():
+    """Build the openpyxl cell styling shared by every report, once per process"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, Color
+    return {
+        'header_font': Font(bold=True, size=12),
+        'header_fill': PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid"),
+        'header_alignment': Alignment(horizontal='center', vertical='center', wrap_text=True),
+        'thin_border': Border(
+            left=Side(style='thin'), right=Side(style='thin'),
+            top=Side(style='thin'), bottom=Side(style='thin')
+        ),
+        'hyperlink_font': Font(underline='single', color=Color(theme=10)),
+        'bold_font': Font(bold=True),
+        'band_fills': {
+            'even': PatternFill(start_color="F9F9F9", end_color="F9F9F9", fill_type="solid"),
+            'profit_high': PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
+            'profit_medium': PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid"),
+            'profit_negative': PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        }
+    }
+
+# Report column name -> (kind, width); columns not listed are sized to their content
+URL_COLUMNS = ['Item URL', 'Google Search', 'Amazon Search']
+COLUMN_SPECS = {
+    'Description': (None, 40),
+    'Enhanced Description': (None, 40),
+    'OCR Text': (None, 40),
+    'LLM Product Info': (None, 30),
+    'Used Search Query': (None, 30),
+    'Current Bid': ('currency', 12),
+    'Market Price': ('currency', 12),
+    'Potential Profit': ('currency', 12),
+    'Profit Margin %': ('percentage', 12),
+    **{column: ('hyperlink', None) for column in URL_COLUMNS}
+}
+
 class ReportGenerator:
     """Generate reports from auction item data"""
     
@@ -23,257 +70,373 @@ class ReportGenerator:
         """Generate Excel report with sorted opportunities"""
         logger.info("Generating Excel report")
         
+        # Create full path for output file
+        output_path = os.path.join(OUTPUT_DIR, output_file)
+        
         try:
-            # Create full path for output file
-            output_path = os.path.join(OUTPUT_DIR, output_file)
-            
-            # Create DataFrame
-            data = []
-            skipped_items = 0
-            for item in items:
-                # If LLM is enabled and couldn't identify the product, skip this item
-                if OPENROUTER_ENABLED and not item.get('skip_for_processing', False):
-                    llm_info = item.get('llm_product_info', {})
-                    # Skip if product type or brand is unknown/unclear and LLM was used
-                    if (llm_info.get('product_type', '') in ['Unknown', ''] or 
-                        llm_info.get('brand', '') in ['Unknown', '']) and 'llm_product_info' in item:
-                        skipped_items += 1
-                        item['skip_for_processing'] = True
-                        logger.info(f"Skipping item {item.get('lotNumber', '')}: LLM couldn't identify product")
-                        continue
-                
-                # Calculate profit margin percentage
-                current_bid = item.get('current_bid_float', 0) or 0
-                market_price = item.get('market_price', 0) or 0
-                potential_profit = market_price - current_bid if market_price > 0 else 0
-                
-                # Calculate profit margin as a percentage
-                profit_margin = 0
-                if market_price > 0 and current_bid > 0:
-                    profit_margin = (potential_profit / current_bid) * 100
-                
-                # Format the image URLs as a string
-                image_urls = ', '.join(item.get('images', []))
-                
-                # Extract LLM product information if available
-                llm_info = item.get('llm_product_info', {})
-                llm_product_info = ""
-                if llm_info:
-                    # Format the LLM product info as a string
-                    product_type = llm_info.get('product_type', 'Unknown')
-                    brand = llm_info.get('brand', 'Unknown')
-                    model = llm_info.get('model', 'Unknown')
-                    attributes = llm_info.get('attributes', 'N/A')
-                    
-                    llm_product_info = f"{brand} {model} ({product_type}) - {attributes}"
-                
-                # Create direct search links for verification
-                search_query = item.get('used_search_query', '')
-                google_search_url = f"https://www.google.com/search?q={quote_plus(search_query)}"
-                amazon_search_url = f"https://www.amazon.com/s?k={quote_plus(search_query)}"
-                
-                data.append({
-                    'Lot Number': item.get('lotNumber', ''),
-                    'Description': item.get('description', ''),
-                    'Enhanced Description': item.get('enhanced_description', ''),
-                    'LLM Product Info': llm_product_info,
-                    'Used Search Query': search_query,
-                    'Current Bid': current_bid,
-                    'Market Price': market_price,
-                    'Potential Profit': potential_profit,
-                    'Profit Margin %': profit_margin,
-                    'ROI': profit_margin,  # Added as duplicate column with different header
-                    'Time Remaining': item.get('timeRemaining', ''),
-                    'Item URL': item.get('itemUrl', ''),
-                    'Google Search': google_search_url,
-                    'Amazon Search': amazon_search_url,
-                    'Image URLs': image_urls,
-                    'OCR Text': item.get('ocr_text', '')
-                })
-            
-            # Log how many items were skipped
-            if skipped_items > 0:
-                logger.info(f"Skipped {skipped_items} items due to insufficient LLM product identification")
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
-            # Add metadata
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            auction_name = AUCTION_URL.split('/')[-3]  # Extract auction name from URL
+            df, metadata = ReportGenerator._build_report_frames(items)
+        except Exception as e:
+            logger.error(f"Error building report data: {e}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return None
+        
+        # Prefer the Rust-backed writer when it is installed, then openpyxl streaming
+        # rows in write-only mode; if the styled writers fail, still save the data
+        writers = []
+        if FastExcel is not None:
+            writers.append(('FastExcel', ReportGenerator._write_fast_excel))
+        writers.append(('openpyxl', ReportGenerator._write_openpyxl_report))
+        writers.append(('plain', ReportGenerator._write_plain_report))
+        
+        for writer_name, writer in writers:
+            try:
+                writer(output_path, df, metadata)
+                logger.info(f"Report saved to {output_path}")
+                return output_path
+            except Exception as e:
+                logger.error(f"Error writing Excel report with {writer_name} writer: {e}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+        return None
+    
+    @staticmethod
+    def _build_report_frames(items):
+        """Build the sorted opportunities DataFrame and its metadata from the scraped items"""
+        import pandas as pd
+        
+        # If LLM is enabled, skip items it couldn't identify
+        skip_mask = [ReportGenerator._should_skip_item(item) for item in items]
+        skipped_items = sum(skip_mask)
+        for item, skip in zip(items, skip_mask):
+            if skip:
+                item['skip_for_processing'] = True
+                logger.info(f"Skipping item {item.get('lotNumber', '')}: LLM couldn't identify product")
+        
+        # Log how many items were skipped
+        if skipped_items > 0:
+            logger.info(f"Skipped {skipped_items} items due to insufficient LLM product identification")
+        
+        # Load the raw fields of the kept items in one shot; missing keys become NaN.
+        # Skipped items are filtered while the frame is built, not copied out afterwards
+        raw = pd.DataFrame((item for item, skip in zip(items, skip_mask) if not skip), columns=[
+            'lotNumber', 'description', 'enhanced_description', 'llm_product_info',
+            'used_search_query', 'current_bid_float', 'market_price', 'timeRemaining',
+            'itemUrl', 'images', 'ocr_text'
+        ])
+        
+        # Calculate profit and profit margin percentage column-wise
+        current_bid = pd.to_numeric(raw['current_bid_float'], errors='coerce').fillna(0)
+        market_price = pd.to_numeric(raw['market_price'], errors='coerce').fillna(0)
+        potential_profit = (market_price - current_bid).where(market_price > 0, 0)
+        profit_margin = (potential_profit / current_bid * 100).where((market_price > 0) & (current_bid > 0), 0)
+        
+        # Create direct search links for verification
+        # Each distinct query is URL-encoded once and shared by both links
+        search_query = raw['used_search_query'].fillna('')
+        unique_queries = search_query.unique()
+        encoded_query = search_query.map(dict(zip(unique_queries, map(quote_plus, unique_queries)))).astype(str)
+        google_search_url = 'https://www.google.com/search?q=' + encoded_query
+        amazon_search_url = 'https://www.amazon.com/s?k=' + encoded_query
+        
+        # Create DataFrame
+        df = pd.DataFrame({
+            'Lot Number': raw['lotNumber'].fillna(''),
+            'Description': raw['description'].fillna(''),
+            'Enhanced Description': raw['enhanced_description'].fillna(''),
+            'LLM Product Info': raw['llm_product_info'].map(
+                ReportGenerator._format_llm_info, na_action='ignore').fillna(''),
+            'Used Search Query': search_query,
+            'Current Bid': current_bid,
+            'Market Price': market_price,
+            'Potential Profit': potential_profit,
+            'Profit Margin %': profit_margin,
+            'Time Remaining': raw['timeRemaining'].fillna(''),
+            'Item URL': raw['itemUrl'].fillna(''),
+            'Google Search': google_search_url,
+            'Amazon Search': amazon_search_url,
+            'Image URLs': raw['images'].map(', '.join, na_action='ignore').fillna(''),
+            'OCR Text': raw['ocr_text'].fillna('')
+        })
+        # The raw frame is no longer needed once the report columns exist
+        del raw
+        
+        # Add metadata
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Order by potential profit (descending); a stable sort keeps ties in scrape order
+        df = df.sort_values('Potential Profit', ascending=False, kind='stable')
+        
+        # Create a metadata sheet
+        metadata = pd.DataFrame({
+            'Property': ['Generated On', 'Auction', 'Auction URL', 'Total Items', 'Top Profit Item', 'Items Skipped'],
+            'Value': [
+                timestamp, 
+                AUCTION_SLUG,
+                AUCTION_URL, 
+                int(len(df)),
+                df.iloc[0]['Description'] if not df.empty else 'None',
+                int(skipped_items)
+            ]
+        })
+        
+        return df, metadata
+    
+    @staticmethod
+    def _should_skip_item(item):
+        """Check whether the LLM was used but couldn't identify the item's product"""
+        if not OPENROUTER_ENABLED or item.get('skip_for_processing', False):
+            return False
+        if 'llm_product_info' not in item:
+            return False
+        llm_info = item.get('llm_product_info', {})
+        # Skip if product type or brand is unknown/unclear
+        return (llm_info.get('product_type', '') in ['Unknown', ''] or
+                llm_info.get('brand', '') in ['Unknown', ''])
+    
+    @staticmethod
+    def _format_llm_info(llm_info):
+        """Format the LLM product info as a string"""
+        if not llm_info:
+            return ""
+        product_type = llm_info.get('product_type', 'Unknown')
+        brand = llm_info.get('brand', 'Unknown')
+        model = llm_info.get('model', 'Unknown')
+        attributes = llm_info.get('attributes', 'N/A')
+        return f"{brand} {model} ({product_type}) - {attributes}"
+    
+    @staticmethod
+    def _column_widths(df):
+        """Width of every report column: the COLUMN_SPECS width, else sized to the content"""
+        import pandas as pd
+        
+        widths = {}
+        for column in df.columns:
+            _, width = COLUMN_SPECS.get(column, (None, None))
+            if width is None:
+                values = df[column]
+                if pd.api.types.is_string_dtype(values):
+                    # Text columns - size to the longest value with pandas' vectorized string length
+                    content_width = values.astype('string').str.len().max()
+                    if pd.isna(content_width):
+                        content_width = 0
+                    # Limit max width and apply some padding
+                    width = min(max(len(str(column)), int(content_width)) + 2, 40)
+                else:
+                    # Non-text columns get a fixed width
+                    width = 15
+            widths[column] = width
+        return widths
+    
+    @staticmethod
+    def _write_openpyxl_report(output_path, df, metadata):
+        """
+        Write the report with openpyxl in write-only mode
+        
+        Rows are streamed to disk as WriteOnlyCell objects that already carry
+        their style and hyperlink, so the full cell grid is never held in
+        memory and no cell is revisited after it has been written.
+        """
+        import numpy as np
+        import pandas as pd
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import NamedStyle
+        from openpyxl.utils import get_column_letter
+        from openpyxl.utils.dataframe import dataframe_to_rows
+        
+        styles = _openpyxl_styles()
+        workbook = Workbook(write_only=True)
+        
+        # Define cell styling
+        workbook.add_named_style(NamedStyle(
+            name='report_header', font=styles['header_font'], fill=styles['header_fill'],
+            alignment=styles['header_alignment'], border=styles['thin_border']
+        ))
+        workbook.add_named_style(NamedStyle(name='report_header_plain', font=styles['bold_font']))
+        
+        # Every (kind, band, bold) combination becomes one named style, registered
+        # on first use; cells then take a single style reference instead of
+        # separate fill/font/number_format writes
+        style_names = {}
+        
+        def cell_style(kind, band, bold):
+            key = (kind, band, bold)
+            if key not in style_names:
+                parts = [part for part in (kind, band, 'bold' if bold else None) if part]
+                name = 'report_' + '_'.join(parts) if parts else None
+                if name:
+                    style = NamedStyle(name=name)
+                    if kind in NUMBER_FORMATS:
+                        style.number_format = NUMBER_FORMATS[kind]
+                    if kind == 'hyperlink':
+                        style.font = styles['hyperlink_font']
+                    if bold:
+                        style.font = styles['bold_font']
+                    if band:
+                        style.fill = styles['band_fills'][band]
+                    workbook.add_named_style(style)
+                style_names[key] = name
+            return style_names[key]
+        
+        worksheet = workbook.create_sheet('Opportunities')
+        columns = list(df.columns)
+        
+        # Column widths and default number formats must be set before the
+        # first row is streamed; one pass over the spec table covers both
+        column_kinds = []
+        column_dimensions = worksheet.column_dimensions
+        column_widths = ReportGenerator._column_widths(df)
+        for col_num, column in enumerate(columns, start=1):  # Excel columns start at 1
+            kind, _ = COLUMN_SPECS.get(column, (None, None))
+            column_kinds.append(kind)
+            dimension = column_dimensions[get_column_letter(col_num)]
+            dimension.width = column_widths[column]
+            if kind in NUMBER_FORMATS:
+                dimension.number_format = NUMBER_FORMATS[kind]
+        
+        rows = dataframe_to_rows(df, index=False, header=True)
+        
+        # Header row, plus the extra Image Links column
+        header = []
+        for column in next(rows):
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.style = 'report_header'
+            header.append(cell)
+        image_links_header = WriteOnlyCell(worksheet, value='Image Links')
+        image_links_header.style = 'report_header_plain'
+        header.append(image_links_header)
+        worksheet.append(header)
+        
+        # Column roles were resolved above, so the row walk below makes every
+        # styling decision in a single pass without name lookups per cell
+        profit_index = columns.index('Profit Margin %')
+        image_urls_index = columns.index('Image URLs')
+        image_link_texts = {}
+        
+        # Which URL cells carry a link is decided per column up front with a
+        # vectorized length check, instead of a truthiness/isinstance test per cell
+        has_link = {
+            columns.index(column): (df[column].astype('string').str.len() > 0).fillna(False).tolist()
+            for column in URL_COLUMNS if column in columns
+        }
+        
+        # Profit bands and row highlights come straight off the numeric column
+        profit_values = df['Profit Margin %'].to_numpy()
+        highlight_rows = (profit_values >= 100).tolist()  # Over 100% profit
+        profit_bands = np.select(
+            [profit_values >= 100, profit_values >= 50, profit_values < 0],  # >100%, 50-100%, negative
+            ['profit_high', 'profit_medium', 'profit_negative'],
+            default=''
+        ).tolist()
+        
+        for row_offset, (values, highlight_row, profit_band) in enumerate(zip(rows, highlight_rows, profit_bands)):
+            row_num = row_offset + 2  # Excel is 1-indexed and we have headers
+            row_band = 'even' if row_num % 2 == 0 else None
             
-            # Sort by potential profit (descending)
-            df = df.sort_values(by='Potential Profit', ascending=False)
+            # Alternating row colors, overridden by the profit margin bands
+            profit_band = profit_band or row_band
             
-            # Format the Excel file
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                # Write the main data
-                df.to_excel(writer, sheet_name='Opportunities', index=False)
-                
-                # Create a metadata sheet
-                metadata = pd.DataFrame({
-                    'Property': ['Generated On', 'Auction URL', 'Total Items', 'Top Profit Item', 'Items Skipped'],
-                    'Value': [
-                        timestamp, 
-                        AUCTION_URL, 
-                        len(df),
-                        df.iloc[0]['Description'] if not df.empty else 'None',
-                        skipped_items
-                    ]
-                })
-                metadata.to_excel(writer, sheet_name='Metadata', index=False)
-                
-                # Get the workbook and worksheets
-                workbook = writer.book
-                worksheet = writer.sheets['Opportunities']
-                
-                # Convert URLs to hyperlinks
-                url_columns = ['Item URL', 'Google Search', 'Amazon Search']
-                for col_num, column in enumerate(df.columns):
-                    if column in url_columns:
-                        for row_num, url in enumerate(df[column], start=2):  # start=2 because Excel is 1-indexed and we have headers
-                            if url and isinstance(url, str):
-                                # Add hyperlink to cell
-                                cell = worksheet.cell(row=row_num, column=col_num+1)  # +1 because Excel columns are 1-indexed
-                                cell.hyperlink = url
-                                cell.style = 'Hyperlink'
-                    
-                    # Handle Image URLs column (multiple links separated by commas)
-                    elif column == 'Image URLs':
-                        # Add a new Image Links column if not already there
-                        image_links_col = None
-                        for i, col in enumerate(df.columns):
-                            if col == 'Image Links':
-                                image_links_col = i
-                                break
-                        
-                        if image_links_col is None:
-                            # Create a new Image Links column
-                            image_links_col = len(df.columns)
-                            worksheet.cell(row=1, column=image_links_col+1).value = 'Image Links'
-                            
-                            # Make the header bold
-                            from openpyxl.styles import Font
-                            worksheet.cell(row=1, column=image_links_col+1).font = Font(bold=True)
-                        
-                        # Now add links to each row
-                        for row_num, urls_str in enumerate(df[column], start=2):
-                            if urls_str and isinstance(urls_str, str):
-                                # Split by commas
-                                urls = urls_str.split(', ')
-                                if urls:
-                                    # Create clickable links for each image
-                                    link_text = ""
-                                    for i, url in enumerate(urls, 1):
-                                        url = url.strip()
-                                        if url:
-                                            link_text += f"Image {i} "
-                                            cell = worksheet.cell(row=row_num, column=image_links_col+1)
-                                            cell.value = link_text.strip()
-                                            # Make the cell a hyperlink to the first image
-                                            if i == 1:
-                                                cell.hyperlink = url
-                                                cell.style = 'Hyperlink'
-                
-                # Define cell styling
-                header_font = Font(bold=True, size=12)
-                header_fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-                header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                thin_border = Border(
-                    left=Side(style='thin'), right=Side(style='thin'),
-                    top=Side(style='thin'), bottom=Side(style='thin')
-                )
-                
-                # Apply header styling
-                for col_num, column in enumerate(df.columns, start=1):
-                    cell = worksheet.cell(row=1, column=col_num)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = thin_border
+            row = []
+            for col_index, (kind, value) in enumerate(zip(column_kinds, values)):
+                cell = WriteOnlyCell(worksheet, value=value)
                 
-                # Set column widths and formatting
-                for col_num, column in enumerate(df.columns, start=1):  # Excel columns start at 1
-                    column_letter = worksheet.cell(row=1, column=col_num).column_letter
-                    
-                    # Set appropriate widths based on content type
-                    if column in ['Description', 'Enhanced Description', 'OCR Text']:
-                        # Text columns - limit to reasonable width
-                        worksheet.column_dimensions[column_letter].width = 40
-                    elif column in ['LLM Product Info', 'Used Search Query']:
-                        # Medium-width columns
-                        worksheet.column_dimensions[column_letter].width = 30
-                    elif column in ['Current Bid', 'Market Price', 'Potential Profit']:
-                        # Currency columns
-                        worksheet.column_dimensions[column_letter].width = 12
-                        # Apply currency format
-                        for row_num in range(2, len(df) + 2):
-                            cell = worksheet.cell(row=row_num, column=col_num)
-                            cell.number_format = FORMAT_CURRENCY_USD_SIMPLE
-                    elif column in ['Profit Margin %', 'ROI']:
-                        # Percentage columns
-                        worksheet.column_dimensions[column_letter].width = 12
-                        # Apply percentage format
-                        for row_num in range(2, len(df) + 2):
-                            cell = worksheet.cell(row=row_num, column=col_num)
-                            cell.number_format = '0.00"%"'
+                if kind == 'hyperlink':
+                    if has_link[col_index][row_offset]:
+                        cell.hyperlink = value
                     else:
-                        # Other columns - dynamically set width
-                        try:
-                            column_width = max(len(str(column)), df[column].astype(str).map(len).max())
-                            # Limit max width and apply some padding
-                            column_width = min(column_width + 2, 40)
-                            worksheet.column_dimensions[column_letter].width = column_width
-                        except:
-                            # Fallback for new columns or errors
-                            worksheet.column_dimensions[column_letter].width = 15
+                        kind = None
                 
-                # Apply alternating row colors
-                for row_num in range(2, len(df) + 2):
-                    if row_num % 2 == 0:
-                        for col_num in range(1, len(df.columns) + 1):
-                            cell = worksheet.cell(row=row_num, column=col_num)
-                            cell.fill = PatternFill(start_color="F9F9F9", end_color="F9F9F9", fill_type="solid")
+                band = profit_band if col_index == profit_index else row_band
                 
-                # Color-code the profit margin cells
-                profit_margin_col = None
-                for col_num, column in enumerate(df.columns, start=1):
-                    if column == 'Profit Margin %':
-                        profit_margin_col = col_num
-                        break
+                # Highlight high-potential rows, leaving profit-colored cells alone
+                bold = highlight_row and band == row_band
                 
-                if profit_margin_col:
-                    for row_num in range(2, len(df) + 2):
-                        cell = worksheet.cell(row=row_num, column=profit_margin_col)
-                        value = cell.value
-                        if isinstance(value, (int, float)):
-                            if value >= 100:  # Over 100% profit
-                                cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                            elif value >= 50:  # 50-100% profit
-                                cell.fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-                            elif value < 0:    # Negative profit
-                                cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                
-                # Add conditional formatting to highlight high-potential items
-                for row_num in range(2, len(df) + 2):
-                    try:
-                        profit_cell = worksheet.cell(row=row_num, column=profit_margin_col) if profit_margin_col else None
-                        profit_value = profit_cell.value if profit_cell else 0
-                        
-                        # If profit margin is very high (>100%), highlight the entire row
-                        if isinstance(profit_value, (int, float)) and profit_value >= 100:
-                            for col_num in range(1, len(df.columns) + 1):
-                                cell = worksheet.cell(row=row_num, column=col_num)
-                                # Only highlight if not already colored
-                                if cell.fill.start_color.rgb == '00000000' or cell.fill.start_color.rgb == 'FFF9F9F9':
-                                    cell.font = Font(bold=True)
-                    except Exception as e:
-                        logger.error(f"Error formatting row {row_num}: {e}")
+                style = cell_style(kind, band, bold)
+                if style:
+                    cell.style = style
+                row.append(cell)
             
-            logger.info(f"Report saved to {output_path}")
-            return output_path
-        except Exception as e:
-            logger.error(f"Error generating Excel report: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
+            # Image URLs become an "Image 1 Image 2 ..." cell linking to the first image
+            urls_str = values[image_urls_index]
+            urls = [url.strip() for url in urls_str.split(', ') if url.strip()] if isinstance(urls_str, str) else []
+            if urls:
+                # The label only depends on the image count, so each one is built once
+                link_text = image_link_texts.get(len(urls))
+                if link_text is None:
+                    link_text = image_link_texts[len(urls)] = ' '.join(f"Image {i}" for i in range(1, len(urls) + 1))
+                cell = WriteOnlyCell(worksheet, value=link_text)
+                cell.hyperlink = urls[0]
+                cell.style = cell_style('hyperlink', None, False)
+                row.append(cell)
+            
+            worksheet.append(row)
+        
+        # Metadata sheet needs no styling
+        metadata_sheet = workbook.create_sheet('Metadata')
+        for row in dataframe_to_rows(metadata, index=False, header=True):
+            metadata_sheet.append(row)
+        
+        workbook.save(output_path)
+    
+    @staticmethod
+    def _write_fast_excel(output_path, df, metadata):
+        """
+        Write the report with rustpy_xlsxwriter's FastExcel
+        
+        The DataFrames are handed over without a per-cell Python walk. Styling
+        is expressed through the writer's column/header/conditional formats
+        instead of per-cell openpyxl writes, which leaves two differences from
+        the openpyxl report: rows over 100% profit are not bolded, and the
+        banded_rows shading starts on the second data row. The Image Links
+        column shows the first image URL instead of "Image 1 Image 2 ...".
+        """
+        # The search links are already quote_plus-encoded, which FastExcel keeps
+        # as is; the raw query would lose everything after a '#' and keep '&' bare
+        report = df.assign(**{'Image Links': df['Image URLs'].str.split(', ').str[0].fillna('')})
+        
+        header_format = (Format().set_bold().set_font_size(12)
+                         .set_background_color('#E0E0E0').set_align('center')
+                         .set_align('vcenter').set_text_wrap().set_border('thin'))
+        currency_format = Format().set_num_format(NUMBER_FORMATS['currency'])
+        percent_format = Format().set_num_format(NUMBER_FORMATS['percentage'])
+        
+        kind_formats = {'currency': currency_format, 'percentage': percent_format}
+        
+        column_formats = {column: kind_formats[kind] for column, (kind, _) in COLUMN_SPECS.items()
+                          if kind in kind_formats}
+        # Autofit would resize columns from their content, so every width is given explicitly
+        column_widths = ReportGenerator._column_widths(df)
+        
+        # Same colour bands as the openpyxl report
+        profit_bands = [
+            {'type': 'cell', 'criteria': '>=', 'value': 100,
+             'format': Format().set_background_color('#C6EFCE')},
+            {'type': 'cell', 'criteria': 'between', 'min': 50, 'max': 100,
+             'format': Format().set_background_color('#DDEBF7')},
+            {'type': 'cell', 'criteria': '<', 'value': 0,
+             'format': Format().set_background_color('#FFC7CE')}
+        ]
+        
+        # FastExcel stores every number with a decimal point, which would turn the
+        # metadata counts into 2.0; the Property/Value pairs are written as text
+        metadata_text = metadata.astype({'Value': str})
+        
+        (FastExcel(output_path, autofit=False)
+            .format(bold_headers=True)
+            .sheet('Opportunities', report,
+                   header_format=header_format,
+                   column_formats=column_formats,
+                   column_widths=column_widths,
+                   url_columns=URL_COLUMNS + ['Image Links'],
+                   banded_rows='#F9F9F9',
+                   conditional_formats={'Profit Margin %': profit_bands})
+            .sheet('Metadata', metadata_text, ignore_errors=['Value'])
+            .save())
+    
+    @staticmethod
+    def _write_plain_report(output_path, df, metadata):
+        """Write the report data without any styling"""
+        import pandas as pd
+        
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Opportunities', index=False)
+            metadata.to_excel(writer, sheet_name='Metadata', index=False)
@@ -3,6 +3,7 @@ Configuration settings for the Auction Bot
 """
 
 import os
+import glob
 import logging
 import platform
 from pathlib import Path
@@ -19,29 +20,40 @@ HTML_DIR = os.path.join(DATA_DIR, "html")
 PROGRESS_DIR = os.path.join(DATA_DIR, "progress")
 OUTPUT_DIR = os.path.join(DATA_DIR, "output")
 
-# Create all required directories
-for directory in [DATA_DIR, LOGS_DIR, IMAGES_DIR, HTML_DIR, PROGRESS_DIR, OUTPUT_DIR]:
-    os.makedirs(directory, exist_ok=True)
+# Create all required directories; parents=True creates DATA_DIR along the way
+for directory in [LOGS_DIR, IMAGES_DIR, HTML_DIR, PROGRESS_DIR, OUTPUT_DIR]:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+# Values accepted as "on" for boolean environment toggles
+_TRUE = frozenset({'true', '1', 't', 'yes', 'y'})
+
+def _env_bool(name, default):
+    """Read a boolean toggle from the environment"""
+    return os.getenv(name, default).strip().lower() in _TRUE
 
 # Configuration
 HOME_IP = os.getenv('HOME_IP', "127.0.0.1")  # Your home IP to avoid
-ENABLE_VPN_CHECK = os.getenv('ENABLE_VPN_CHECK', 'True').lower() in ('true', '1', 't')  # VPN check toggle
-HEADLESS_BROWSER = os.getenv('HEADLESS_BROWSER', 'True').lower() in ('true', '1', 't')  # Headless browser toggle
+ENABLE_VPN_CHECK = _env_bool('ENABLE_VPN_CHECK', 'True')  # VPN check toggle
+HEADLESS_BROWSER = _env_bool('HEADLESS_BROWSER', 'True')  # Headless browser toggle
 MAX_ITEMS = 100  # Maximum number of items to process
 NETWORK_TIMEOUT = int(os.getenv('NETWORK_TIMEOUT', '60000'))  # Network timeout in milliseconds
+DEBUG_DUMP_HTML = _env_bool('DEBUG_DUMP_HTML', 'False')  # Save scraped page HTML to data/html for debugging
+DEBUG_DUMP_IMAGES = _env_bool('DEBUG_DUMP_IMAGES', 'False')  # Save the preprocessed OCR input next to each image for debugging
 # AUCTION_URL = "https://www.bidrl.com/auction/high-end-auctions-9415-madison-ave-orangevale-ca-95662-april-25th-173079/bidgallery/perpage_NjA"
 AUCTION_URL = "https://www.bidrl.com/auction/highend-auction-212-harding-blvd-ste-g-roseville-ca-95678-may-2nd-173431/bidgallery/page_NQ"
+AUCTION_SLUG = AUCTION_URL.split('/')[-3] if AUCTION_URL.count('/') >= 3 else AUCTION_URL  # Auction name from the URL
 
 # Search configuration
-ENABLE_AMAZON_SEARCH = os.getenv('ENABLE_AMAZON_SEARCH', 'False').lower() in ('true', '1', 't')
+ENABLE_AMAZON_SEARCH = _env_bool('ENABLE_AMAZON_SEARCH', 'False')
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', "")
 GOOGLE_CX = os.getenv('GOOGLE_CX', "")
-USE_GOOGLE_API = os.getenv('USE_GOOGLE_API', 'True').lower() in ('true', '1', 't') and GOOGLE_API_KEY and GOOGLE_CX
+USE_GOOGLE_API = _env_bool('USE_GOOGLE_API', 'True') and GOOGLE_API_KEY and GOOGLE_CX
 
 # Object detection configuration
-CLOUD_VISION_ENABLED = os.getenv('CLOUD_VISION_ENABLED', 'False').lower() in ('true', '1', 't')
-OBJECT_DETECTION_ENABLED = os.getenv('OBJECT_DETECTION_ENABLED', 'True').lower() in ('true', '1', 't')
-PRODUCT_SEARCH_ENABLED = os.getenv('PRODUCT_SEARCH_ENABLED', 'True').lower() in ('true', '1', 't')
+CLOUD_VISION_ENABLED = _env_bool('CLOUD_VISION_ENABLED', 'False')
+OPENCV_FALLBACK_ONLY = _env_bool('OPENCV_FALLBACK_ONLY', 'True')  # Skip OpenCV for images Cloud Vision already described
+OBJECT_DETECTION_ENABLED = _env_bool('OBJECT_DETECTION_ENABLED', 'True')
+PRODUCT_SEARCH_ENABLED = _env_bool('PRODUCT_SEARCH_ENABLED', 'True')
 
 # OCR Configuration
 # Determine Tesseract path based on operating system
@@ -49,11 +61,25 @@ if platform.system() == 'Windows':
     TESSERACT_PATH = os.getenv('TESSERACT_PATH', r'C:\Program Files\Tesseract-OCR\tesseract')
 else:  # Linux/Mac
     TESSERACT_PATH = os.getenv('TESSERACT_PATH', '/usr/bin/tesseract')
+
+# Language data directory for the in-process tesserocr bindings, which (unlike the
+# tesseract binary) don't find it on their own: TESSDATA_PREFIX, else the folder next
+# to the binary (the Windows installer layout), else the usual Linux/Mac locations
+TESSDATA_PATH = os.getenv('TESSDATA_PREFIX') or next((
+    path for path in [
+        os.path.join(os.path.dirname(TESSERACT_PATH), 'tessdata'),
+        *sorted(glob.glob('/usr/share/tesseract-ocr/*/tessdata'), reverse=True),
+        '/usr/share/tesseract-ocr/tessdata',
+        '/usr/share/tessdata',
+        '/usr/local/share/tessdata',
+        '/opt/homebrew/share/tessdata'
+    ] if os.path.isdir(path)
+), None)
     
 # OCR configuration
-TESSERACT_CONFIG = r'--oem 3 -l eng --psm 4'  # OCR Engine Mode 3, Page Segmentation Mode 4
+TESSERACT_CONFIG = r'--oem 1 -l eng --psm 4'  # OCR Engine Mode 1 (LSTM only), Page Segmentation Mode 4
 
 # LLM-based search query generation
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', "")
 OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', "anthropic/claude-3-opus-20240229")
-OPENROUTER_ENABLED = os.getenv('OPENROUTER_ENABLED', 'False').lower() in ('true', '1', 't') and OPENROUTER_API_KEY
\ No newline at end of file
+OPENROUTER_ENABLED = _env_bool('OPENROUTER_ENABLED', 'False') and OPENROUTER_API_KEY
\ No newline at end of file
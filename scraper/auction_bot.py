@@ -9,93 +9,117 @@ import random
 import asyncio
 import traceback
 import requests
+from bs4 import BeautifulSoup
 
 from config import (
     MAX_ITEMS, HOME_IP, AUCTION_URL, ENABLE_VPN_CHECK, HEADLESS_BROWSER,
-    OBJECT_DETECTION_ENABLED, PRODUCT_SEARCH_ENABLED
+    OBJECT_DETECTION_ENABLED, PRODUCT_SEARCH_ENABLED, DEBUG_DUMP_HTML, OPENROUTER_ENABLED
 )
 from utils.logger import setup_logger
-from utils.file_utils import save_json, save_html
-from scraper.item_extractor import ItemExtractor
+from utils.file_utils import save_json, append_jsonl, save_html
+from utils import ocr_cache
+from scraper.item_extractor import ItemExtractor, HTML_PARSER
 from scraper.image_processor import ImageProcessor
-from scraper.object_detector import ObjectDetector
+from scraper.object_detector import ObjectDetector, detection_cache
 from scraper.product_identifier import ProductIdentifier
 from scraper.price_finder import PriceFinder
+from scraper.llm_query_generator import LLMQueryGenerator, llm_cache
 
 # Set up logger
 logger = setup_logger("AuctionBot")
 
+# Number of items whose market price is researched at the same time
+MAX_PRICE_LOOKUPS = 5
+
+# Seconds a passed VPN check stays valid, and how long the IP lookup may take
+IP_CHECK_TTL = 60
+IP_CHECK_TIMEOUT = 5
+
+# Longest wait, in milliseconds, for the first auction item to render on the gallery page
+ITEMS_WAIT_TIMEOUT = 15000
+
+# Browser pages scraping item pages in parallel; kept small to avoid site throttling
+BROWSER_PAGES = 3
+
+# Requests the browser aborts, since only the page DOM is scraped
+BLOCKED_RESOURCES = re.compile(r'\.(png|jpe?g|gif|webp|css|woff2?)(\?.*)?$', re.IGNORECASE)
+
 class AuctionBot:
     """Main class to scrape auction sites for profitable items"""
     
+    # Fallback selectors for different elements, shared by every instance;
+    # ItemExtractor compiles each one once and reuses it
+    selectors = {
+        'items': [
+            '.aucbox',  # Main container for each auction item
+            '.bidgridbox',  # Alternative container
+            '.bid-gallery-item', 
+            '.auction-item',
+            '.item-card',
+            '.lot-item',
+            'div[data-lot-id]'
+        ],
+        'lot_number': [
+            'b:contains("Lot #")',  # Looks for text that contains "Lot #"
+            '.lot-number',
+            '.item-lot-number',
+            '.lot-id'
+        ],
+        'description': [
+            '.gridbox-item-title b',  # Title/description element
+            'li.gridbox-item-title b',  # Alternative title element
+            '.title',
+            '.item-title',
+            '.description',
+            '.item-description'
+        ],
+        'bid': [
+            'span.float-right[data-currency]',  # Current bid amount
+            'li:contains("Current Bid:") span.float-right',  # Alternative bid element
+            '.amount',
+            '.current-bid',
+            '.price',
+            '.bid-amount'
+        ],
+        'time': [
+            'li:contains("Time Remaining:") span.float-right span',  # Time remaining element
+            'span:contains("H, "):contains("M, "):contains("S")',  # Time in H, M, S format
+            '.time-left',
+            '.countdown',
+            '.auction-end-time',
+            '.time-remaining'
+        ],
+        'images': [
+            '.itemlist-image-slider img',  # Image elements
+            'a.pic img',  # Alternative image element
+            'light-gallery li[data-src]',  # Light gallery images
+            'light-gallery img[data-src]',  # Alternative light gallery images
+            'img[src*="auctionimages"]'  # Images from auctionimages domain
+        ],
+        'link': [
+            '.gridbox-item-title a',  # Link to item detail
+            'a.pic',  # Alternative link element
+            'a',
+            '.item-link',
+            '.view-details'
+        ]
+    }
+    
     def __init__(self):
         """Initialize the AuctionBot with required components"""
         self.items = []
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")  # Names this run's progress files
         self.ua = self._get_user_agent()
-        self.session = None
+        self.session = None  # requests session for the VPN IP check
+        self._ip_checked_at = float('-inf')  # When the VPN check last passed
+        self.http = None  # aiohttp session shared by image downloads across items
         self.page = None
+        self.pages = []
         self.playwright = None
         self.browser = None
         self.context = None
         self.price_finder = PriceFinder()
         self.product_identifier = ProductIdentifier()
-        
-        # Define fallback selectors for different elements
-        self.selectors = {
-            'items': [
-                '.aucbox',  # Main container for each auction item
-                '.bidgridbox',  # Alternative container
-                '.bid-gallery-item', 
-                '.auction-item',
-                '.item-card',
-                '.lot-item',
-                'div[data-lot-id]'
-            ],
-            'lot_number': [
-                'b:contains("Lot #")',  # Looks for text that contains "Lot #"
-                '.lot-number',
-                '.item-lot-number',
-                '.lot-id'
-            ],
-            'description': [
-                '.gridbox-item-title b',  # Title/description element
-                'li.gridbox-item-title b',  # Alternative title element
-                '.title',
-                '.item-title',
-                '.description',
-                '.item-description'
-            ],
-            'bid': [
-                'span.float-right[data-currency]',  # Current bid amount
-                'li:contains("Current Bid:") span.float-right',  # Alternative bid element
-                '.amount',
-                '.current-bid',
-                '.price',
-                '.bid-amount'
-            ],
-            'time': [
-                'li:contains("Time Remaining:") span.float-right span',  # Time remaining element
-                'span:contains("H, "):contains("M, "):contains("S")',  # Time in H, M, S format
-                '.time-left',
-                '.countdown',
-                '.auction-end-time',
-                '.time-remaining'
-            ],
-            'images': [
-                '.itemlist-image-slider img',  # Image elements
-                'a.pic img',  # Alternative image element
-                'light-gallery li[data-src]',  # Light gallery images
-                'light-gallery img[data-src]',  # Alternative light gallery images
-                'img[src*="auctionimages"]'  # Images from auctionimages domain
-            ],
-            'link': [
-                '.gridbox-item-title a',  # Link to item detail
-                'a.pic',  # Alternative link element
-                'a',
-                '.item-link',
-                '.view-details'
-            ]
-        }
     
     def _get_user_agent(self):
         """Get a random user agent"""
@@ -109,12 +133,20 @@ class AuctionBot:
     
     def check_ip_safe(self):
         """Verify VPN is active by checking current IP is not the home IP"""
+        # A check that passed moments ago (e.g. from main) doesn't need another round-trip
+        if time.monotonic() - self._ip_checked_at < IP_CHECK_TTL:
+            logger.debug("VPN check passed recently, reusing result")
+            return True
+        
         try:
-            current_ip = requests.get('https://api.ipify.org').text
+            if self.session is None:
+                self.session = requests.Session()
+            current_ip = self.session.get('https://api.ipify.org', timeout=IP_CHECK_TIMEOUT).text
             if current_ip == HOME_IP:
                 logger.error("USING HOME IP! VPN is not active or not working properly. Please activate your VPN before running this script.")
                 return False
             logger.info(f"VPN CHECK PASSED! Using IP: {current_ip} (not your home IP)")
+            self._ip_checked_at = time.monotonic()
             return True
         except Exception as e:
             logger.error(f"Could not check IP: {e}")
@@ -147,9 +179,13 @@ class AuctionBot:
                 viewport={"width": 1920, "height": 1080}
             )
             
-            # Create a new page
-            logger.debug("Creating new page")
-            self.page = await self.context.new_page()
+            # Item pages only need the DOM; skip images, stylesheets and fonts
+            await self.context.route(BLOCKED_RESOURCES, lambda route: route.abort())
+            
+            # Create the pages; the first also drives the auction gallery page
+            logger.debug(f"Creating {BROWSER_PAGES} pages")
+            self.pages = [await self.context.new_page() for _ in range(BROWSER_PAGES)]
+            self.page = self.pages[0]
             
             logger.info("Successfully set up browser with Playwright")
             return self.page
@@ -175,14 +211,16 @@ class AuctionBot:
             
             # Close any other resources
             await self.price_finder.close()
+            if self.session:
+                self.session.close()
         except Exception as e:
             logger.error(f"Error cleaning up browser: {e}")
     
     async def analyze_page_structure(self, url):
-        """Analyze page structure and log element counts for debugging"""
+        """Load the page and find working selectors, returning them with the parsed page HTML"""
         if not self.page:
             logger.error("No page available to analyze")
-            return
+            return None, None
         
         logger.info(f"Analyzing page structure for: {url}")
         
@@ -191,22 +229,30 @@ class AuctionBot:
             logger.debug(f"Navigating to {url}")
             await self.page.goto(url, wait_until="networkidle")
             
-            # Wait for content to load - bidrl.com might need more time
-            await asyncio.sleep(5)  # Increased wait time
+            # Wait until any known item container has rendered, rather than a fixed delay
+            try:
+                await self.page.wait_for_selector(', '.join(self.selectors['items']), timeout=ITEMS_WAIT_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"No item container rendered within {ITEMS_WAIT_TIMEOUT} ms: {e}")
             
             # Get the page HTML and save it for analysis
             html_content = await self.page.content()
-            html_filepath = save_html(html_content, "page_structure")
-            logger.debug(f"Saved HTML content to {html_filepath}")
+            if DEBUG_DUMP_HTML:
+                # Blocking disk write; keep it off the event loop the browser pages share
+                html_filepath = await asyncio.to_thread(save_html, html_content, "page_structure")
+                if html_filepath:
+                    logger.debug(f"Saved HTML content to {html_filepath}")
             
-            # Find working selectors
-            working_selectors = await ItemExtractor.find_working_selectors(self.page, self.selectors)
+            # Parse once, on a thread so the event loop stays responsive; finding
+            # selectors and item URLs both read this snapshot
+            soup = await asyncio.to_thread(BeautifulSoup, html_content, HTML_PARSER)
+            working_selectors = await ItemExtractor.find_working_selectors(self.page, self.selectors, soup)
             
-            return working_selectors
+            return working_selectors, soup
         except Exception as e:
             logger.error(f"Error analyzing page structure: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
+            return None, None
     
     async def process_all_items(self):
         """Process all items in the auction, one by one"""
@@ -221,6 +267,10 @@ class AuctionBot:
             logger.info(f"Starting to process auction at {AUCTION_URL} without VPN protection")
         
         try:
+            # One HTTP session for the whole run, so image connections stay alive between items
+            self.http = ImageProcessor.create_session()
+            ImageProcessor.start_ocr_workers()
+            
             # Set up browser
             page = await self.setup_browser()
             if not page:
@@ -229,7 +279,7 @@ class AuctionBot:
             
             # Analyze page structure to find working selectors
             logger.info("Analyzing auction page structure")
-            working_selectors = await self.analyze_page_structure(AUCTION_URL)
+            working_selectors, soup = await self.analyze_page_structure(AUCTION_URL)
             
             if not working_selectors:
                 logger.error("Could not find working selectors for elements")
@@ -237,7 +287,12 @@ class AuctionBot:
             
             # Get item URLs
             logger.info("Getting item URLs")
-            item_urls = await ItemExtractor.get_item_urls(self.page, working_selectors)
+            item_urls = await ItemExtractor.get_item_urls(self.page, working_selectors, soup)
+            
+            # Only the URLs are needed from here on; free the auction page's tree now rather
+            # than holding it (and its parent/child reference cycles) for the whole run
+            soup.decompose()
+            soup = None
             
             if not item_urls:
                 logger.error("No item URLs found")
@@ -248,46 +303,19 @@ class AuctionBot:
                 logger.info(f"Limiting to {MAX_ITEMS} items")
                 item_urls = item_urls[:MAX_ITEMS]
             
-            # Process each item one by one
+            # Process items in parallel, one worker per browser page pulling URLs off a queue
             self.items = []
+            results = [None] * len(item_urls)
+            queue = asyncio.Queue()
             for i, url in enumerate(item_urls):
-                try:
-                    logger.info(f"Processing item {i+1}/{len(item_urls)}: {url}")
-                    
-                    # Extract item details
-                    item = await ItemExtractor.extract_item_details(self.page, url)
-                    
-                    if not item:
-                        logger.warning(f"Failed to extract details for item at {url}, skipping")
-                        continue
-                    
-                    # Process item images with OCR
-                    item = await ImageProcessor.process_images(item)
-                    
-                    # Enhance with object detection if enabled
-                    if OBJECT_DETECTION_ENABLED:
-                        logger.info(f"Running object detection on images for item {i+1}")
-                        item = await ObjectDetector.enhance_item_with_object_detection(item)
-                    
-                    # Identify product if enabled
-                    if PRODUCT_SEARCH_ENABLED:
-                        logger.info(f"Identifying product details for item {i+1}")
-                        item = await self.product_identifier.identify_product(item)
-                    
-                    # Add to items list
-                    self.items.append(item)
-                    
-                    # Save progress after each item
-                    save_json(self.items, f"progress_{i+1}_of_{len(item_urls)}.json")
-                    
-                    # Add delay to avoid overloading
-                    await asyncio.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing item {i+1}: {e}")
-                    logger.error(f"Traceback: {traceback.format_exc()}")
+                queue.put_nowait((i, url))
+            await asyncio.gather(*(self._process_item_worker(page, queue, results) for page in self.pages))
+            
+            # Keep the items in auction page order, whatever order they finished in
+            self.items = [item for item in results if item]
             
             logger.info(f"Successfully processed {len(self.items)} items")
+            save_json(self.items, f"items_{self.run_id}.json")
             return True
         
         except Exception as e:
@@ -298,12 +326,84 @@ class AuctionBot:
         finally:
             # Clean up browser resources
             await self.cleanup_browser()
+            if self.http:
+                await self.http.close()
+                self.http = None
+            await ObjectDetector.close()
+            # Every OCR and detection lookup for the run is done; save the new cache entries, off the event loop
+            await asyncio.to_thread(ocr_cache.flush)
+            await asyncio.to_thread(detection_cache.flush)
+    
+    async def _process_item_worker(self, page, queue, results):
+        """Extract and process queued item URLs one after another on a single browser page"""
+        while not queue.empty():
+            i, url = queue.get_nowait()
+            try:
+                logger.info(f"Processing item {i+1}/{len(results)}: {url}")
+                
+                # Extract item details
+                item = await ItemExtractor.extract_item_details(page, url)
+                
+                if not item:
+                    logger.warning(f"Failed to extract details for item at {url}, skipping")
+                    continue
+                
+                # Process item images with OCR
+                item = await ImageProcessor.process_images(item, self.http)
+                
+                # Enhance with object detection if enabled
+                if OBJECT_DETECTION_ENABLED:
+                    logger.info(f"Running object detection on images for item {i+1}")
+                    item = await ObjectDetector.enhance_item_with_object_detection(item)
+                
+                # Identify product if enabled
+                if PRODUCT_SEARCH_ENABLED:
+                    logger.info(f"Identifying product details for item {i+1}")
+                    item = await self.product_identifier.identify_product(item)
+                
+                # Add to items list
+                results[i] = item
+                
+                # Save progress after each item by appending just that item, off the event loop
+                await asyncio.to_thread(append_jsonl, item, f"progress_{self.run_id}.jsonl")
+                
+                # Add delay to avoid overloading
+                await asyncio.sleep(random.uniform(1, 3))
+                
+            except Exception as e:
+                logger.error(f"Error processing item {i+1}: {e}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
     
     async def determine_market_prices(self):
-        """Determine market prices for all items"""
+        """Determine market prices for all items, researching several items at once"""
         logger.info("Starting market price research")
         
-        for i, item in enumerate(self.items):
+        semaphore = asyncio.Semaphore(MAX_PRICE_LOOKUPS)
+        try:
+            # Generate every item's LLM search queries up front, many requests at once,
+            # instead of one OpenRouter round trip inside each of the few price lookup slots
+            llm_results = [None] * len(self.items)
+            if OPENROUTER_ENABLED:
+                logger.info(f"Generating LLM search queries for {len(self.items)} items")
+                llm_results = await LLMQueryGenerator.generate_search_queries_batch(self.items)
+            
+            await asyncio.gather(*(
+                self._research_market_price(i, item, semaphore, llm_results[i]) for i, item in enumerate(self.items)
+            ))
+        finally:
+            # Price research runs after cleanup_browser, so close the search and LLM
+            # sessions it opened here rather than leaving them to the interpreter
+            await self.price_finder.close()
+            # Save the run's new LLM responses in one write, off the event loop
+            await asyncio.to_thread(llm_cache.flush)
+        
+        logger.info("Market price research completed")
+        save_json(self.items, f"priced_items_{self.run_id}.json")
+        return True
+    
+    async def _research_market_price(self, i, item, semaphore, llm_results=None):
+        """Determine the market price and potential profit of a single item"""
+        async with semaphore:
             logger.info(f"Researching price for item {i+1}/{len(self.items)}: {item.get('lotNumber', 'Unknown')}")
             
             # Get current bid as float
@@ -319,7 +419,7 @@ class AuctionBot:
             
             # Get market price - this is now an async function
             try:
-                market_price = await self.price_finder.get_best_market_price(item)
+                market_price = await self.price_finder.get_best_market_price(item, llm_results)
                 item['market_price'] = market_price
                 
                 # Calculate potential profit
@@ -331,11 +431,8 @@ class AuctionBot:
                 item['market_price'] = 0.0
                 item['potential_profit'] = 0.0
             
-            # Add delay to avoid overloading APIs or getting blocked
-            await asyncio.sleep(random.uniform(1, 3))
+            # Save progress after each item by appending just that item, off the event loop
+            await asyncio.to_thread(append_jsonl, item, f"price_progress_{self.run_id}.jsonl")
             
-            # Save progress after each item
-            save_json(self.items, f"price_progress_{i+1}_of_{len(self.items)}.json")
-        
-        logger.info("Market price research completed")
-        return True
+            # Short jitter before this slot takes the next item, to avoid overloading APIs or getting blocked
+            await asyncio.sleep(random.uniform(0.2, 0.8))
@@ -4,32 +4,161 @@ Image processing and OCR for auction items
 
 import os
 import re
-import time
 import pytesseract
 import cv2
 import numpy as np
-from PIL import Image, ImageEnhance
+from PIL import Image
 from io import BytesIO
 import aiohttp
 import asyncio
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
-from config import TESSERACT_PATH, TESSERACT_CONFIG, IMAGES_DIR
+# Images are OCRed in parallel by the worker processes below, one per core; keep
+# each Tesseract (library or binary) to one OpenMP thread so they don't oversubscribe.
+# Set before tesserocr loads libgomp, which reads it once at load time
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+try:
+    # In-process libtesseract bindings; avoids starting a tesseract binary per OCR pass
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
+from config import TESSERACT_PATH, TESSDATA_PATH, TESSERACT_CONFIG, IMAGES_DIR, NETWORK_TIMEOUT, DEBUG_DUMP_IMAGES
 from utils.logger import setup_logger
-from utils.file_utils import generate_image_filepath
+from utils.file_utils import generate_image_filepath, item_file_id
+from utils.brands import find_brands
+from utils import ocr_cache
 
-# Configure pytesseract
+# Configure pytesseract (used when tesserocr is not installed)
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 
 # Set up logger
 logger = setup_logger("ImageProcessor")
 
+# Maximum number of images of one item downloaded and processed at once
+MAX_IMAGE_CONCURRENCY = 8
+
+# Larger downloads are abandoned; product photos are well under this
+MAX_IMAGE_BYTES = 8_000_000
+DOWNLOAD_CHUNK_SIZE = 65536
+
+# Longest side images are scaled down to before OCR; more resolution doesn't help Tesseract
+MAX_OCR_DIMENSION = 1500
+
+# Refuse to decode anything bigger than this (PIL's decompression bomb guard)
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+# Cheap gates that skip OCR on images unlikely to contain text
+MIN_OCR_PIXELS = 200 * 200  # Smaller images are thumbnails
+MIN_OCR_CONTRAST = 15  # Grayscale standard deviation below this is a blank image
+MIN_OCR_EDGE_DENSITY = 1.0  # Mean of the Canny edge map (0-255) below this means no text strokes
+MIN_OCR_CONFIDENCE = 40  # Mean Tesseract word confidence (0-100) below this means the "text" is noise
+
+# OpenCV preprocessing and Tesseract are CPU-bound; run them across cores in
+# worker processes (started on first use) so they never block the event loop.
+# Sized to the CPUs this process may actually run on, which in a container or
+# under taskset can be far fewer than os.cpu_count() reports
+OCR_WORKERS = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+# One tesserocr API per worker process, created when the worker starts and kept resident
+_tess_api = None
+_tess_init_tried = False
+
+def _create_tess_api():
+    """Create a tesserocr API with the same language, engine and page segmentation modes as TESSERACT_CONFIG"""
+    lang = re.search(r'-l\s+(\S+)', TESSERACT_CONFIG)
+    oem = re.search(r'--oem\s+(\d+)', TESSERACT_CONFIG)
+    psm = re.search(r'--psm\s+(\d+)', TESSERACT_CONFIG)
+    # The bindings' built-in tessdata path is rarely right, so point them at the one config found
+    path = {'path': os.path.join(TESSDATA_PATH, '')} if TESSDATA_PATH else {}
+    api = PyTessBaseAPI(
+        lang=lang.group(1) if lang else 'eng',
+        oem=int(oem.group(1)) if oem else 1,
+        psm=int(psm.group(1)) if psm else 3,
+        **path
+    )
+    # '-c name=value' options become Tesseract variables, set once per API
+    for name, value in re.findall(r'-c\s+([^=\s]+)=(\S+)', TESSERACT_CONFIG):
+        api.SetVariable(name, value)
+    return api
+
+def _init_ocr_worker():
+    """Load Tesseract's language model once per OCR worker, before its first image arrives"""
+    global _tess_api, _tess_init_tried
+    if PyTessBaseAPI is None or _tess_init_tried:
+        return
+    _tess_init_tried = True
+    
+    # An exception escaping a pool initializer breaks the whole pool, so a failed
+    # load only leaves _tess_api unset and OCR goes through the tesseract binary
+    try:
+        _tess_api = _create_tess_api()
+    except Exception as e:
+        _tess_api = None
+        logger.error(f"Could not load tesserocr, using the tesseract binary instead: {e}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+
+_OCR_POOL = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_ocr_worker)
+
+# Patterns to identify model numbers; only ever run on lowercased text, so no IGNORECASE
+MODEL_PATTERNS = [re.compile(pattern) for pattern in [
+    r'model[: ]?([a-z0-9\-]{3,15})',
+    r'part[.: #]?([a-z0-9\-]{3,15})',
+    r'series[: ]?([a-z0-9\-]{2,10})',
+    r'type[: ]?([a-z0-9\-]{2,10})',
+    r'\b([a-z]{1,4}[0-9]{2,6})\b',  # Like SM550 
+    r'\b([a-z]{1,4}-[0-9]{2,6})\b', # Like SM-550
+    r'\b([0-9]{1,4}[a-z]{1,4})\b',  # Like 55HD
+    r'\b(v[0-9]{1,3})\b',           # Like V10, V8
+    r'#\s?([a-z0-9]{5,12})\b',      # Like #AB12345
+    r'sku[: ]?([a-z0-9\-]{4,15})',  
+    r'upc[: ]?([0-9\-]{10,15})',
+    r'ean[: ]?([0-9\-]{10,15})'
+]]
+
+class CharFilter(dict):
+    """str.translate() table that keeps ASCII letters, digits, whitespace and the given punctuation, and blanks everything else"""
+    
+    def __init__(self, punctuation):
+        super().__init__()
+        self.punctuation = punctuation
+    
+    def __missing__(self, codepoint):
+        # Decided once per distinct character, then served from the dict by translate()'s C loop
+        char = chr(codepoint)
+        keep = (char.isascii() and char.isalnum()) or char.isspace() or char in self.punctuation
+        self[codepoint] = codepoint if keep else ' '
+        return self[codepoint]
+
+# Text cleanup tables and patterns
+OCR_CHAR_FILTER = CharFilter('.,-$%#/')  # Keeps punctuation that can be part of model numbers
+DESCRIPTION_CHAR_FILTER = CharFilter('.,-#')
+LOT_NUMBER_PREFIX = re.compile(r'Lot #.*?:')
+OCR_TEXT_SEPARATOR = ' | '  # '|' is blanked by OCR_CHAR_FILTER
+
 class ImageProcessor:
     """Process images with OCR to extract text"""
     
     @staticmethod
-    async def process_images(item):
-        """Process all images for a single item using OCR"""
+    def create_session():
+        """Create the HTTP session shared by image downloads across all items"""
+        # Keep-alive connections and cached DNS let later items reuse the image CDN connections
+        connector = aiohttp.TCPConnector(limit=128, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=60)
+        # A stalled CDN connection must not hold a download slot forever; NETWORK_TIMEOUT is in ms
+        timeout = aiohttp.ClientTimeout(total=NETWORK_TIMEOUT / 1000)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+    
+    @staticmethod
+    def start_ocr_workers():
+        """Start the OCR worker processes now, so they load Tesseract while the browser is still busy"""
+        # Any task makes the pool start its workers, each running _init_ocr_worker once
+        _OCR_POOL.submit(os.getpid)
+    
+    @staticmethod
+    async def process_images(item, session):
+        """Process all images for a single item using OCR, downloading through the given aiohttp session"""
         if not item or not item.get('images'):
             logger.warning(f"No images to process for item: {item.get('lotNumber', 'Unknown')}")
             return item
@@ -46,176 +175,50 @@ class ImageProcessor:
         
         enhanced_description = item.get('description', '')
         ocr_texts = []
-        brands_found = []
-        model_numbers_found = []
+        model_numbers_found = set()
         
-        lot_id = item.get('lotNumber', '').replace(' ', '_').replace('#', '').replace(':', '')
-        if not lot_id:
-            lot_id = f"unknown_{int(time.time())}"
+        lot_id = item_file_id(item)
         
-        # Common brand names to look for
-        common_brands = [
-            'samsung', 'sony', 'apple', 'lg', 'bosch', 'dewalt', 'milwaukee', 
-            'makita', 'craftsman', 'ryobi', 'stanley', 'black and decker', 'black & decker',
-            'kitchenaid', 'whirlpool', 'ge', 'general electric', 'maytag', 'kenmore',
-            'frigidaire', 'philips', 'panasonic', 'toshiba', 'sharp', 'dell', 'hp',
-            'microsoft', 'lenovo', 'asus', 'acer', 'canon', 'nikon', 'sony', 'gopro',
-            'bose', 'sennheiser', 'jbl', 'sonos', 'klipsch', 'polk', 'pioneer',
-            'yamaha', 'denon', 'vizio', 'insignia', 'nintendo', 'playstation', 'xbox',
-            'dyson', 'shark', 'hoover', 'eureka', 'bissell', 'miele', 'roomba', 'irobot',
-            'nutribullet', 'kitchenaid', 'cuisinart', 'ninja', 'breville', 'calphalon',
-            'coleman', 'weber', 'traeger', 'yeti', 'north face', 'patagonia', 'columbia',
-            'nike', 'adidas', 'under armour', 'new balance', 'puma', 'reebok',
-            'levi\'s', 'gap', 'calvin klein', 'ralph lauren', 'gucci', 'coach',
-            'rolex', 'casio', 'citizen', 'seiko', 'timex', 'fossil', 'omega',
-            'lego', 'mattel', 'hasbro', 'fisher price', 'barbie', 'nerf',
-            'ikea', 'ashley', 'la-z-boy', 'ethan allen', 'thomasville', 'bassett'
-        ]
+        # Download and OCR every image concurrently, bounded by a semaphore;
+        # results come back in image order
+        semaphore = asyncio.Semaphore(MAX_IMAGE_CONCURRENCY)
+        ocr_results = await asyncio.gather(*(
+            ImageProcessor._fetch_and_ocr(session, semaphore, i, img_url, len(images), lot_id)
+            for i, img_url in enumerate(images)
+        ))
         
-        # Pattern to identify model numbers
-        model_patterns = [
-            r'model[: ]?([a-z0-9\-]{3,15})',
-            r'part[.: #]?([a-z0-9\-]{3,15})',
-            r'series[: ]?([a-z0-9\-]{2,10})',
-            r'type[: ]?([a-z0-9\-]{2,10})',
-            r'\b([a-z]{1,4}[0-9]{2,6})\b',  # Like SM550 
-            r'\b([a-z]{1,4}-[0-9]{2,6})\b', # Like SM-550
-            r'\b([0-9]{1,4}[a-z]{1,4})\b',  # Like 55HD
-            r'\b(v[0-9]{1,3})\b',           # Like V10, V8
-            r'#\s?([a-z0-9]{5,12})\b',      # Like #AB12345
-            r'sku[: ]?([a-z0-9\-]{4,15})',  
-            r'upc[: ]?([0-9\-]{10,15})',
-            r'ean[: ]?([0-9\-]{10,15})'
-        ]
+        for i, combined_ocr in enumerate(ocr_results):
+            if not combined_ocr:
+                continue
+            
+            # Clean up OCR text - remove extra whitespace, line breaks, etc. - then blank
+            # everything but text and the punctuation that might be part of model numbers
+            cleaned_text = ' '.join(combined_ocr.split()).translate(OCR_CHAR_FILTER)
+            
+            ocr_texts.append(cleaned_text)
+            logger.info(f"Extracted OCR text from image {i+1}: {cleaned_text[:100]}...")
         
-        async with aiohttp.ClientSession() as session:
-            # First, download and save all images
-            for i, img_url in enumerate(images):
-                try:
-                    logger.debug(f"Downloading image {i+1}/{len(images)}: {img_url}")
-                    
-                    async with session.get(img_url) as response:
-                        if response.status != 200:
-                            logger.warning(f"Failed to download image {i+1}: HTTP {response.status}")
-                            continue
-                        
-                        img_data = await response.read()
-                    
-                    # Save the original image
-                    pil_image = Image.open(BytesIO(img_data))
-                    image_filepath = generate_image_filepath(lot_id, i+1)
-                    pil_image.save(image_filepath)
-                    logger.debug(f"Saved image to {image_filepath}")
-                    
-                    # Skip OCR for the last image
-                    if i == len(images) - 1 and len(images) > 1:
-                        logger.debug(f"Skipping OCR for last image (image {i+1})")
-                        continue
-                    
-                    # Process image with OCR using OpenCV for better preprocessing
-                    logger.debug(f"Processing image {i+1} with OCR + OpenCV")
-                    
-                    # Convert PIL image to OpenCV format
-                    cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                    
-                    # Resize image if it's too large (for better OCR performance)
-                    max_dim = 1500
-                    h, w = cv_image.shape[:2]
-                    if max(h, w) > max_dim:
-                        # Calculate new dimensions while preserving aspect ratio
-                        if h > w:
-                            new_h, new_w = max_dim, int(w * max_dim / h)
-                        else:
-                            new_h, new_w = int(h * max_dim / w), max_dim
-                        cv_image = cv2.resize(cv_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
-                        logger.debug(f"Resized image from {w}x{h} to {new_w}x{new_h}")
-                    
-                    # Crop off bottom 5% of the image to remove auction info
-                    h, w = cv_image.shape[:2]
-                    crop_height = int(h * 0.95)  # Remove bottom 5%
-                    cv_image = cv_image[0:crop_height, 0:w]
-                    
-                    # Save the cropped image (for debugging)
-                    cropped_filepath = generate_image_filepath(lot_id, i+1, "_cropped")
-                    cv2.imwrite(cropped_filepath, cv_image)
-                    
-                    # Use multiple preprocessing techniques for better OCR
-                    ocr_results = []
-                    
-                    # Approach 1: Basic grayscale
-                    gray_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-                    
-                    # Save the grayscale image (for debugging)
-                    gray_filepath = generate_image_filepath(lot_id, i+1, "_gray")
-                    cv2.imwrite(gray_filepath, gray_image)
-                    
-                    # Run OCR on grayscale image
-                    ocr_text1 = pytesseract.image_to_string(gray_image, config=TESSERACT_CONFIG)
-                    if ocr_text1.strip():
-                        ocr_results.append(ocr_text1)
-                    
-                    # Approach 2: Thresholding for better text contrast
-                    # Try multiple thresholding methods and combine results
-                    # Binary threshold
-                    _, binary_image = cv2.threshold(gray_image, 150, 255, cv2.THRESH_BINARY)
-                    ocr_text2 = pytesseract.image_to_string(binary_image, config=TESSERACT_CONFIG)
-                    if ocr_text2.strip():
-                        ocr_results.append(ocr_text2)
-                    
-                    # Adaptive threshold (good for varying lighting conditions)
-                    adaptive_image = cv2.adaptiveThreshold(
-                        gray_image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-                    )
-                    ocr_text3 = pytesseract.image_to_string(adaptive_image, config=TESSERACT_CONFIG)
-                    if ocr_text3.strip():
-                        ocr_results.append(ocr_text3)
-                    
-                    # Approach 3: Edge enhancement
-                    # Detect edges and dilate them to enhance text
-                    edges = cv2.Canny(gray_image, 100, 200)
-                    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-                    dilated_edges = cv2.dilate(edges, kernel, iterations=1)
-                    # Invert for OCR
-                    dilated_edges = cv2.bitwise_not(dilated_edges)
-                    ocr_text4 = pytesseract.image_to_string(dilated_edges, config=TESSERACT_CONFIG)
-                    if ocr_text4.strip():
-                        ocr_results.append(ocr_text4)
-                    
-                    # Combine all OCR results
-                    combined_ocr = " ".join(ocr_results)
-                    
-                    if combined_ocr.strip():
-                        # Clean up OCR text - remove extra whitespace, line breaks, etc.
-                        cleaned_text = ' '.join(combined_ocr.strip().split())
-                        
-                        # Keep more punctuation and special characters (might be part of model numbers)
-                        cleaned_text = re.sub(r'[^a-zA-Z0-9\s\.,\-\$%#\/]', ' ', cleaned_text)
-                        
-                        # Look for brand names in OCR text
-                        lower_text = cleaned_text.lower()
-                        for brand in common_brands:
-                            if re.search(r'\b' + re.escape(brand) + r'\b', lower_text):
-                                brands_found.append(brand)
-                                logger.info(f"Found brand in image {i+1}: {brand}")
-                        
-                        # Look for model numbers in OCR text
-                        for pattern in model_patterns:
-                            matches = re.findall(pattern, lower_text, re.IGNORECASE)
-                            for match in matches:
-                                if isinstance(match, tuple) and match:
-                                    match = match[0]
-                                if match and len(match) >= 3:  # Avoid very short matches
-                                    model_numbers_found.append(match)
-                                    logger.info(f"Found potential model number in image {i+1}: {match}")
-                        
-                        ocr_texts.append(cleaned_text)
-                        logger.info(f"Extracted OCR text from image {i+1}: {cleaned_text[:100]}...")
-                    else:
-                        logger.debug(f"No text extracted from image {i+1}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing image {i+1}: {e}")
-                    logger.error(f"Traceback: {traceback.format_exc()}")
+        # Scan the OCR text of all images for brand names and model numbers in one pass;
+        # the separator can't occur in cleaned text, so no match spans two images
+        lower_text = OCR_TEXT_SEPARATOR.join(ocr_texts).lower()
+        brands_found = find_brands(lower_text)
+        for brand in sorted(brands_found):
+            logger.info(f"Found brand in OCR text: {brand}")
+        
+        for pattern in MODEL_PATTERNS:
+            matches = pattern.findall(lower_text)
+            for match in matches:
+                if isinstance(match, tuple) and match:
+                    match = match[0]
+                if match and len(match) >= 3 and match not in model_numbers_found:  # Avoid very short matches
+                    model_numbers_found.add(match)
+                    logger.info(f"Found potential model number in OCR text: {match}")
+        
+        # Remove any lot numbers from the enhanced description
+        clean_description = enhanced_description
+        if 'Lot #' in clean_description:
+            # Remove the lot number part from the description
+            clean_description = LOT_NUMBER_PREFIX.sub('', clean_description).strip()
         
         # Combine OCR texts into enhanced description
         if ocr_texts:
@@ -226,21 +229,16 @@ class ImageProcessor:
             
             # Store the raw OCR text and identified information
             item['ocr_text'] = combined_ocr
-            item['ocr_brands'] = list(set(brands_found))
-            item['ocr_model_numbers'] = list(set(model_numbers_found))
+            item['ocr_brands'] = sorted(brands_found)
+            item['ocr_model_numbers'] = sorted(model_numbers_found)
             
             # Create an enhanced description by combining original description with OCR
-            # Remove any lot numbers from the enhanced description
-            clean_description = enhanced_description
-            if 'Lot #' in clean_description:
-                # Remove the lot number part from the description
-                clean_description = re.sub(r'Lot #.*?:', '', clean_description).strip()
-            
             # Check if the original description already has model numbers or SKUs
             # Try to detect model numbers in the original description
             original_model_numbers = []
-            for pattern in model_patterns:
-                matches = re.findall(pattern, clean_description.lower(), re.IGNORECASE)
+            lower_description = clean_description.lower()
+            for pattern in MODEL_PATTERNS:
+                matches = pattern.findall(lower_description)
                 for match in matches:
                     if isinstance(match, tuple) and match:
                         match = match[0]
@@ -256,11 +254,12 @@ class ImageProcessor:
                 brand_enhancement = ""
                 if brands_found:
                     unique_brands = []
-                    for brand in brands_found:
-                        if brand.lower() not in clean_description.lower():
+                    for brand in sorted(brands_found):
+                        # Brands are lowercase already; a substring test so multi-word brands match too
+                        if brand not in lower_description:
                             unique_brands.append(brand)
                     if unique_brands:
-                        brand_enhancement = ' '.join(set(unique_brands)) + ' '
+                        brand_enhancement = ' '.join(unique_brands) + ' '
                 
                 # Put original description first, then add brands and OCR text
                 combined_description = f"{clean_description} {brand_enhancement}{combined_ocr}"
@@ -268,9 +267,9 @@ class ImageProcessor:
                 # Original description doesn't have model numbers, so add them first
                 important_info = []
                 if brands_found:
-                    important_info.append(' '.join(set(brands_found)))
+                    important_info.append(' '.join(sorted(brands_found)))
                 if model_numbers_found:
-                    important_info.append(' '.join(set(model_numbers_found)))
+                    important_info.append(' '.join(sorted(model_numbers_found)))
                 
                 # Then add the original description and OCR text
                 if important_info:
@@ -280,29 +279,211 @@ class ImageProcessor:
                     # No model numbers found at all, keep original description first
                     combined_description = f"{clean_description} {combined_ocr}"
             
-            # Allow more characters (model numbers might have special chars)
-            filtered_description = re.sub(r'[^a-zA-Z0-9\s\.,\-#]', ' ', combined_description)
-            # Remove extra spaces
-            filtered_description = re.sub(r'\s+', ' ', filtered_description).strip()
+            # Blank disallowed characters and collapse whitespace in one C pass each
+            filtered_description = ' '.join(combined_description.translate(DESCRIPTION_CHAR_FILTER).split())
             
             item['enhanced_description'] = filtered_description
             logger.info(f"Enhanced description with OCR text: {filtered_description[:100]}...")
         else:
             # Just use the original description if no OCR text was found
-            # Remove any lot numbers from the enhanced description
-            clean_description = enhanced_description
-            if 'Lot #' in clean_description:
-                # Remove the lot number part from the description
-                clean_description = re.sub(r'Lot #.*?:', '', clean_description).strip()
-            
-            # Allow more characters
-            filtered_description = re.sub(r'[^a-zA-Z0-9\s\.,\-#]', ' ', clean_description)
-            # Remove extra spaces
-            filtered_description = re.sub(r'\s+', ' ', filtered_description).strip()
-                
-            item['enhanced_description'] = filtered_description
+            item['enhanced_description'] = ' '.join(clean_description.translate(DESCRIPTION_CHAR_FILTER).split())
             item['ocr_brands'] = []
             item['ocr_model_numbers'] = []
             logger.warning("No OCR text extracted from any images")
         
         return item
+    
+    @staticmethod
+    async def _fetch_and_ocr(session, semaphore, i, img_url, image_count, lot_id):
+        """Download one image and run OCR on it, returning the combined OCR text or None"""
+        try:
+            # Skip OCR for the last image
+            run_ocr = not (i == image_count - 1 and image_count > 1)
+            
+            # Reruns reuse earlier results as long as the saved image is still on disk
+            url_key = ocr_cache.url_key(img_url)
+            cached = ocr_cache.get(url_key)
+            if cached is not None and os.path.exists(generate_image_filepath(lot_id, i+1)):
+                logger.debug(f"Using cached OCR result for image {i+1}")
+                return cached or None
+            
+            async with semaphore:
+                logger.debug(f"Downloading image {i+1}/{image_count}: {img_url}")
+                
+                async with session.get(img_url) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to download image {i+1}: HTTP {response.status}")
+                        return None
+                    
+                    if (response.content_length or 0) > MAX_IMAGE_BYTES:
+                        logger.warning(f"Skipping image {i+1}: {response.content_length} bytes is over the download limit")
+                        return None
+                    
+                    # Stream the body so an oversized image without Content-Length is cut off early;
+                    # chunks are joined once at the end rather than copied into a growing buffer
+                    chunks = []
+                    size = 0
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            logger.warning(f"Skipping image {i+1}: body is over the download limit")
+                            return None
+                    img_data = b''.join(chunks)
+                
+                # Identical images listed under another URL or lot share one OCR result;
+                # hashlib releases the GIL, so multi-MB images hash off the event loop
+                content_key = await asyncio.to_thread(ocr_cache.content_key, img_data) if run_ocr else None
+                cached = ocr_cache.get(content_key) if run_ocr else None
+                if cached is not None:
+                    logger.debug(f"Using cached OCR result for identical image {i+1}")
+                
+                # The original bytes go to disk on a thread while image decoding and OCR
+                # run in the process pool; only the combined OCR text comes back,
+                # regex post-processing stays here
+                image_filepath = generate_image_filepath(lot_id, i+1)
+                save = asyncio.to_thread(ImageProcessor._save_image, img_data, image_filepath)
+                if run_ocr and cached is None:
+                    loop = asyncio.get_running_loop()
+                    ocr_text, _ = await asyncio.gather(
+                        loop.run_in_executor(_OCR_POOL, ImageProcessor._ocr_image, img_data, lot_id, i),
+                        save
+                    )
+                else:
+                    if not run_ocr:
+                        logger.debug(f"Skipping OCR for image {i+1}")
+                    ocr_text = None
+                    await save
+                
+                if cached is not None:
+                    ocr_text = cached or None
+                elif run_ocr:
+                    ocr_cache.put(content_key, ocr_text)
+                ocr_cache.put(url_key, ocr_text)
+                return ocr_text
+        except Exception as e:
+            logger.error(f"Error processing image {i+1}: {e}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return None
+    
+    @staticmethod
+    def _save_image(img_data, image_filepath):
+        """Write the downloaded image bytes to disk as-is, without decoding or re-encoding"""
+        with open(image_filepath, 'wb') as f:
+            f.write(img_data)
+        logger.debug(f"Saved image to {image_filepath}")
+    
+    @staticmethod
+    def _ocr_image(img_data, lot_id, i):
+        """Run the OCR preprocessing passes over a downloaded image"""
+        # Only reads the header; pixels are decoded by OpenCV below
+        pil_image = Image.open(BytesIO(img_data))
+        
+        # Thumbnails are too small to hold readable text
+        if pil_image.width * pil_image.height < MIN_OCR_PIXELS:
+            logger.debug(f"Skipping OCR for image {i+1}: {pil_image.width}x{pil_image.height} is too small")
+            return None
+        
+        # Process image with OCR using OpenCV for better preprocessing
+        logger.debug(f"Processing image {i+1} with OCR + OpenCV")
+        
+        # OCR only looks at luminance, so decode straight to an 8-bit grayscale array;
+        # for JPEGs that skips the chroma planes entirely. Formats OpenCV can't read
+        # (e.g. GIF) go through PIL, which handles palette/alpha images too.
+        # Large JPEGs are decoded at 1/2, 1/4 or 1/8 scale, which is far cheaper than a
+        # full decode; the reduced image still has at least MAX_OCR_DIMENSION on its long side
+        read_flag = cv2.IMREAD_GRAYSCALE
+        for factor, flag in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8), (4, cv2.IMREAD_REDUCED_GRAYSCALE_4), (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+            if max(pil_image.size) >= factor * MAX_OCR_DIMENSION:
+                read_flag = flag
+                break
+        gray_image = cv2.imdecode(np.frombuffer(img_data, dtype=np.uint8), read_flag)
+        if gray_image is None:
+            # draft() gives the same reduced-scale luma decode for any JPEG only PIL can read
+            pil_image.draft('L', (MAX_OCR_DIMENSION, MAX_OCR_DIMENSION))
+            gray_image = np.asarray(pil_image.convert('L'))
+        
+        # Resize image if it's too large (for better OCR performance)
+        max_dim = MAX_OCR_DIMENSION
+        h, w = gray_image.shape[:2]
+        if max(h, w) > max_dim:
+            # Calculate new dimensions while preserving aspect ratio
+            if h > w:
+                new_h, new_w = max_dim, int(w * max_dim / h)
+            else:
+                new_h, new_w = int(h * max_dim / w), max_dim
+            gray_image = cv2.resize(gray_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            logger.debug(f"Resized image from {w}x{h} to {new_w}x{new_h}")
+        
+        # Crop off bottom 5% of the image to remove auction info
+        h, w = gray_image.shape[:2]
+        crop_height = int(h * 0.95)  # Remove bottom 5%
+        gray_image = gray_image[0:crop_height, 0:w]
+        
+        # Save the cropped grayscale image (for debugging); the JPEG encode is skipped on normal runs
+        if DEBUG_DUMP_IMAGES:
+            gray_filepath = generate_image_filepath(lot_id, i+1, "_gray")
+            cv2.imwrite(gray_filepath, gray_image)
+        
+        # Near-uniform images (blank backgrounds) and images with almost no edges carry
+        # no text, so don't spend a Tesseract pass on them
+        # meanStdDev and countNonZero are single C passes, unlike ndarray.std()/.mean() which
+        # build a float64 copy of the image; Canny's mean is 255 x its fraction of edge pixels
+        if (cv2.meanStdDev(gray_image)[1][0, 0] < MIN_OCR_CONTRAST
+                or cv2.countNonZero(cv2.Canny(gray_image, 100, 200)) * 255 < MIN_OCR_EDGE_DENSITY * gray_image.size):
+            logger.debug(f"Skipping OCR for image {i+1}: too little contrast or detail to hold text")
+            return None
+        
+        # A single OCR pass over an adaptive threshold, which copes with varying
+        # lighting and gives the text contrast the separate grayscale, binary and
+        # edge passes were each after
+        adaptive_image = ImageProcessor._adaptive_threshold(gray_image)
+        combined_ocr = ImageProcessor._image_to_string(adaptive_image)
+        
+        if not combined_ocr.strip():
+            logger.debug(f"No text extracted from image {i+1}")
+            return None
+        return combined_ocr
+    
+    @staticmethod
+    def _adaptive_threshold(gray_image):
+        """Binarize against a Gaussian local mean, like cv2.adaptiveThreshold(GAUSSIAN_C, 31, 10) but cheaper"""
+        # The 31px Gaussian (sigma 5) local mean is smooth enough to compute at half
+        # resolution (15px, sigma 2.5) and scale back up, at about an eighth of the
+        # filtering cost; the comparison itself stays at full resolution so glyph
+        # edges are as sharp as before
+        h, w = gray_image.shape[:2]
+        small = cv2.resize(gray_image, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+        local_mean = cv2.resize(cv2.GaussianBlur(small, (15, 15), 2.5), (w, h), interpolation=cv2.INTER_LINEAR)
+        # White where the pixel is brighter than its local mean minus 10
+        return cv2.compare(gray_image, cv2.subtract(local_mean, 10), cv2.CMP_GT)
+    
+    @staticmethod
+    def _image_to_string(image):
+        """Run Tesseract on an OpenCV image, returning '' when its words are mostly low-confidence noise"""
+        text, confidences = ImageProcessor._recognize(image)
+        if confidences and sum(confidences) / len(confidences) < MIN_OCR_CONFIDENCE:
+            logger.debug(f"Discarding OCR text with mean word confidence {sum(confidences) / len(confidences):.0f}")
+            return ''
+        return text
+    
+    @staticmethod
+    def _recognize(image):
+        """Run one Tesseract pass, in-process through tesserocr when it is installed, returning text and word confidences"""
+        if _tess_api is None:
+            # Called outside the OCR pool, whose workers already ran the initializer
+            _init_ocr_worker()
+        
+        if _tess_api is None:
+            # tesserocr isn't installed or couldn't load its language data: use the binary.
+            # image_to_data costs the same single tesseract run as image_to_string
+            data = pytesseract.image_to_data(image, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+            words = [(word, float(conf)) for word, conf in zip(data['text'], data['conf']) if word.strip() and float(conf) >= 0]
+            return ' '.join(word for word, _ in words), [conf for _, conf in words]
+        
+        # Hand the pixel buffer straight to Tesseract, without building a PIL image
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = image.shape[2] if image.ndim == 3 else 1
+        _tess_api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        return _tess_api.GetUTF8Text(), _tess_api.AllWordConfidences()
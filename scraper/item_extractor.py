@@ -3,19 +3,69 @@ Extract auction item details from web pages
 """
 
 import re
+import asyncio
 import traceback
+from functools import lru_cache
+import soupsieve
 from bs4 import BeautifulSoup
 
-from config import NETWORK_TIMEOUT
+try:
+    # libxml2's C parser builds the tree far faster than the pure-Python html.parser
+    from lxml import etree
+    HTML_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    HTML_PARSER = 'html.parser'
+
+from config import NETWORK_TIMEOUT, DEBUG_DUMP_HTML
 from utils.logger import setup_logger
 from utils.file_utils import save_html
 
 # Set up logger
 logger = setup_logger("ItemExtractor")
 
+# Item page time left, e.g. "2H, 15M, 30S"
+TIME_REMAINING_PATTERN = re.compile(r'\d+H,\s*\d+M,\s*\d+S')
+
+# Item title "Lot # 123: Description": split at the first colon, when "Lot #" appears anywhere
+LOT_TITLE_PATTERN = re.compile(r'(?=.*?Lot #)([^:]*):(.*)', re.DOTALL)
+
+# Longest wait, in milliseconds, for an item page's title, bid and gallery to render
+ITEM_RENDER_TIMEOUT = 8000
+
+# True once the client-side app has filled in everything extract_item_details reads: the
+# lot title, a bid amount and the image gallery. Pages without a gallery run to the timeout,
+# which is the fixed delay every page used to wait
+ITEM_RENDERED_SCRIPT = """() => {
+    const title = document.querySelector('div.item-head h4');
+    return !!(title && title.textContent.includes('Lot #')
+        && document.querySelector('span[data-currency]')
+        && document.querySelector('light-gallery li[data-src], light-gallery img[data-src]'));
+}"""
+
+if etree is not None:
+    # Compiled XPath for the standard bidrl.com item page, run in C against lxml's tree.
+    # The single-element lookups end in a [1] predicate so libxml2 stops at the first
+    # match; pages they don't fully cover go through the BeautifulSoup lookups instead
+    XP_ITEM_TITLE = etree.XPath(
+        "/descendant::div[contains(concat(' ', normalize-space(@class), ' '), ' item-head ')][1]/descendant::h4[1]"
+    )
+    XP_CURRENT_BID = etree.XPath("/descendant::b[. = 'Current Bid:'][1]/following::span[@data-currency][1]")
+    XP_FIRST_BID = etree.XPath("/descendant::span[@data-currency][1]")
+    XP_TIME_REMAINING = etree.XPath("/descendant::b[. = 'Time Remaining:'][1]/following::div[1]")
+    XP_GALLERY_SRCS = etree.XPath("//light-gallery//li/@data-src", smart_strings=False)
+    XP_TEXT = etree.XPath(".//text()", smart_strings=False)
+    LXML_PARSER = etree.HTMLParser()
+
 class ItemExtractor:
     """Extract auction item details from web pages"""
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def compile_selector(selector):
+        """Compile a CSS selector once, mapping jQuery-style :contains() to soupsieve's :-soup-contains()"""
+        return soupsieve.compile(selector.replace(':contains(', ':-soup-contains('))
+    
     @staticmethod
     async def extract_item_details(page, url):
         """Extract details for a single item"""
@@ -36,141 +86,31 @@ class ItemExtractor:
                 # Try a fallback approach with a simpler wait strategy
                 await page.goto(url, timeout=NETWORK_TIMEOUT)
             
-            # Wait for content to load
-            await page.wait_for_timeout(8000)  # Wait 8 seconds for JS to initialize
+            # Wait until the item's content has rendered, rather than a fixed delay
+            try:
+                await page.wait_for_function(ITEM_RENDERED_SCRIPT, timeout=ITEM_RENDER_TIMEOUT)
+            except Exception as e:
+                logger.debug(f"Item page not fully rendered within {ITEM_RENDER_TIMEOUT} ms, extracting what is there: {e}")
             
-            # Get the page HTML for analysis with BeautifulSoup
+            # Get the page HTML for analysis
             html = await page.content()
-            soup = BeautifulSoup(html, 'html.parser')
             
-            # Log the item page HTML structure for analysis if needed
-            html_filepath = save_html(html, f"item_page_{url.split('/')[-1]}")
-            logger.debug(f"Saved HTML content to {html_filepath}")
+            # Log the item page HTML structure for analysis if needed; the write runs on
+            # a thread so other pages' workers keep going while it hits the disk
+            if DEBUG_DUMP_HTML:
+                html_filepath = await asyncio.to_thread(save_html, html, f"item_page_{url.split('/')[-1]}")
+                if html_filepath:
+                    logger.debug(f"Saved HTML content to {html_filepath}")
             
-            # Extract lot number and description - specific for bidrl.com format
-            lot_number = ""
-            description = ""
-            
-            # Look for the item head section which contains both lot number and description
-            item_head = soup.select_one('div.item-head')
-            if item_head:
-                # Find the h4 element containing both lot number and description
-                h4_element = item_head.select_one('h4')
-                if h4_element:
-                    # Extract the full text which includes both lot number and title
-                    full_title_text = h4_element.text.strip()
-                    logger.debug(f"Found title text: {full_title_text}")
-                    
-                    # Try to parse lot number and description from the full text
-                    if 'Lot #' in full_title_text and ':' in full_title_text:
-                        parts = full_title_text.split(':', 1)
-                        lot_number = parts[0].strip()
-                        description = parts[1].strip() if len(parts) > 1 else ""
-                    else:
-                        # Alternate approach: look for specific spans
-                        lot_span = h4_element.select_one('span[ng-if*="lot_number"]')
-                        if lot_span:
-                            lot_number = lot_span.text.strip()
-                        
-                        desc_span = h4_element.select_one('span[ng-bind-html="item.title"]')
-                        if desc_span:
-                            description = desc_span.text.strip()
-            
-            if not lot_number:
-                # Fallback: Look for any element containing "Lot #"
-                for element in soup.find_all(['h4', 'span', 'b']):
-                    if 'Lot #' in element.text:
-                        lot_number = element.text.strip()
-                        logger.debug(f"Found lot number with fallback: {lot_number}")
-                        break
+            # Parsing and extraction are CPU-bound; run them on a thread so the other
+            # pages' workers keep driving their browser pages in the meantime
+            lot_number, description, current_bid, time_remaining, images = await asyncio.to_thread(
+                ItemExtractor._parse_and_extract_fields, html
+            )
             
             logger.info(f"Extracted lot number: {lot_number}")
             logger.info(f"Extracted description: {description}")
             
-            # Extract current bid - updated for bidrl.com
-            current_bid = ""
-            
-            # First, look for the specific structure from the HTML example
-            current_bid_header = soup.find('b', text='Current Bid:')
-            if current_bid_header and current_bid_header.parent:
-                # Look for the span with data-currency attribute near the header
-                bid_span = current_bid_header.find_next('span', attrs={'data-currency': True})
-                if bid_span:
-                    current_bid = bid_span.text.strip()
-                    logger.debug(f"Found current bid: {current_bid}")
-            
-            # If not found with the above approach, try alternative selectors
-            if not current_bid:
-                bid_spans = soup.select('span[data-currency]')
-                if bid_spans:
-                    current_bid = bid_spans[0].text.strip()
-                    logger.debug(f"Found current bid with alternative selector: {current_bid}")
-            
-            # Extract time remaining - updated for bidrl.com
-            time_remaining = ""
-            
-            # First, look for the specific structure from the HTML example
-            time_remaining_header = soup.find('b', text='Time Remaining:')
-            if time_remaining_header and time_remaining_header.parent:
-                # Find the next div which contains the time
-                time_div = time_remaining_header.find_next('div')
-                if time_div:
-                    time_text = time_div.get_text(strip=True)
-                    # Check if it matches the expected format
-                    if 'H,' in time_text and 'M,' in time_text and 'S' in time_text:
-                        time_remaining = time_text
-                        logger.debug(f"Found time remaining: {time_remaining}")
-            
-            # Fallback approach if the above didn't work
-            if not time_remaining:
-                # Look for any div containing the time format
-                for div in soup.find_all('div'):
-                    div_text = div.get_text(strip=True)
-                    if re.search(r'\d+H,\s*\d+M,\s*\d+S', div_text):
-                        time_remaining = div_text
-                        logger.debug(f"Found time remaining with fallback: {time_remaining}")
-                        break
-            
-            # Extract images - updated for bidrl.com's light-gallery structure
-            images = []
-            
-            # Look for the light-gallery structure as in the HTML example
-            light_gallery_items = soup.select('light-gallery li[data-src]')
-            if light_gallery_items:
-                for item in light_gallery_items:
-                    src = item.get('data-src')
-                    if src:
-                        images.append(src)
-                        logger.debug(f"Found image from light-gallery: {src}")
-            
-            # Fallback approaches if the above didn't work
-            if not images:
-                # Try the img tags inside the light-gallery
-                img_elements = soup.select('light-gallery img[data-src]')
-                if img_elements:
-                    for img in img_elements:
-                        src = img.get('data-src')
-                        if src:
-                            images.append(src)
-                            logger.debug(f"Found image from light-gallery img: {src}")
-            
-            if not images:
-                # Try other common image selectors
-                for selector in ['.item-image-slider img', 'a.pic img', 'img[src*="auctionimages"]']:
-                    img_elements = soup.select(selector)
-                    if img_elements:
-                        for img in img_elements:
-                            src = img.get('src') or img.get('data-src')
-                            if src:
-                                if src.startswith('/'):
-                                    src = f"https://www.bidrl.com{src}"
-                                if not src.startswith('/images/imgloading'):  # Skip loading placeholder images
-                                    images.append(src)
-                        
-                        if images:
-                            logger.debug(f"Found {len(images)} images with selector: {selector}")
-                            break
-            
             # Create item dictionary
             item = {
                 'lotNumber': lot_number,
@@ -189,38 +129,194 @@ class ItemExtractor:
             logger.error(f"Error extracting item details: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
+    
+    @staticmethod
+    def _parse_and_extract_fields(html):
+        """Extract lot number, description, current bid, time remaining and image URLs from an item page"""
+        if etree is not None:
+            fields = ItemExtractor._extract_fields_xpath(html)
+            if fields is not None:
+                return fields
+        
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        # Extract lot number and description - specific for bidrl.com format
+        lot_number = ""
+        description = ""
+        
+        # Look for the item head section which contains both lot number and description
+        item_head = soup.select_one('div.item-head')
+        if item_head:
+            # Find the h4 element containing both lot number and description
+            h4_element = item_head.select_one('h4')
+            if h4_element:
+                # Extract the full text which includes both lot number and title
+                full_title_text = h4_element.text.strip()
+                logger.debug(f"Found title text: {full_title_text}")
+                
+                # Try to parse lot number and description from the full text
+                title_match = LOT_TITLE_PATTERN.match(full_title_text)
+                if title_match:
+                    lot_number = title_match.group(1).strip()
+                    description = title_match.group(2).strip()
+                else:
+                    # Alternate approach: look for specific spans
+                    lot_span = h4_element.select_one('span[ng-if*="lot_number"]')
+                    if lot_span:
+                        lot_number = lot_span.text.strip()
+                    
+                    desc_span = h4_element.select_one('span[ng-bind-html="item.title"]')
+                    if desc_span:
+                        description = desc_span.text.strip()
+        
+        if not lot_number:
+            # Fallback: Look for any element containing "Lot #"
+            for element in soup.find_all(['h4', 'span', 'b']):
+                if 'Lot #' in element.text:
+                    lot_number = element.text.strip()
+                    logger.debug(f"Found lot number with fallback: {lot_number}")
+                    break
+        
+        # Extract current bid - updated for bidrl.com
+        current_bid = ""
+        
+        # First, look for the specific structure from the HTML example
+        current_bid_header = soup.find('b', text='Current Bid:')
+        if current_bid_header and current_bid_header.parent:
+            # Look for the span with data-currency attribute near the header
+            bid_span = current_bid_header.find_next('span', attrs={'data-currency': True})
+            if bid_span:
+                current_bid = bid_span.text.strip()
+                logger.debug(f"Found current bid: {current_bid}")
+        
+        # If not found with the above approach, try alternative selectors
+        if not current_bid:
+            bid_spans = soup.select('span[data-currency]')
+            if bid_spans:
+                current_bid = bid_spans[0].text.strip()
+                logger.debug(f"Found current bid with alternative selector: {current_bid}")
+        
+        # Extract time remaining - updated for bidrl.com
+        time_remaining = ""
+        
+        # First, look for the specific structure from the HTML example
+        time_remaining_header = soup.find('b', text='Time Remaining:')
+        if time_remaining_header and time_remaining_header.parent:
+            # Find the next div which contains the time
+            time_div = time_remaining_header.find_next('div')
+            if time_div:
+                time_text = time_div.get_text(strip=True)
+                # Check if it matches the expected format
+                if 'H,' in time_text and 'M,' in time_text and 'S' in time_text:
+                    time_remaining = time_text
+                    logger.debug(f"Found time remaining: {time_remaining}")
+        
+        # Fallback approach if the above didn't work
+        if not time_remaining:
+            # Look for any div containing the time format. The first div whose text matches
+            # is always an outermost one: any div containing a match contains it too, and
+            # comes first in the document. So only outermost divs need checking
+            for div in soup.find_all('div'):
+                if div.find_parent('div') is not None:
+                    continue
+                div_text = div.get_text(strip=True)
+                if TIME_REMAINING_PATTERN.search(div_text):
+                    time_remaining = div_text
+                    logger.debug(f"Found time remaining with fallback: {time_remaining}")
+                    break
+        
+        # Extract images - updated for bidrl.com's light-gallery structure
+        images = []
+        
+        # Look for the light-gallery structure as in the HTML example
+        light_gallery_items = soup.select('light-gallery li[data-src]')
+        if light_gallery_items:
+            for item in light_gallery_items:
+                src = item.get('data-src')
+                if src:
+                    images.append(src)
+                    logger.debug(f"Found image from light-gallery: {src}")
+        
+        # Fallback approaches if the above didn't work
+        if not images:
+            # Try the img tags inside the light-gallery
+            img_elements = soup.select('light-gallery img[data-src]')
+            if img_elements:
+                for img in img_elements:
+                    src = img.get('data-src')
+                    if src:
+                        images.append(src)
+                        logger.debug(f"Found image from light-gallery img: {src}")
+        
+        if not images:
+            # Try other common image selectors
+            for selector in ['.item-image-slider img', 'a.pic img', 'img[src*="auctionimages"]']:
+                img_elements = soup.select(selector)
+                if img_elements:
+                    for img in img_elements:
+                        src = img.get('src') or img.get('data-src')
+                        if src:
+                            if src.startswith('/'):
+                                src = f"https://www.bidrl.com{src}"
+                            if not src.startswith('/images/imgloading'):  # Skip loading placeholder images
+                                images.append(src)
+                    
+                    if images:
+                        logger.debug(f"Found {len(images)} images with selector: {selector}")
+                        break
+        
+        return lot_number, description, current_bid, time_remaining, images
+    
+    @staticmethod
+    def _extract_fields_xpath(html):
+        """Extract the fields of a standard item page with compiled XPath, or return None so the BeautifulSoup lookups run"""
+        try:
+            tree = etree.fromstring(html, LXML_PARSER)
+        except (etree.LxmlError, ValueError) as e:
+            logger.debug(f"lxml could not parse the item page: {e}")
+            return None
+        if tree is None:
+            return None
+        
+        # Lot number and description from the item head's "Lot # 123: Description" title
+        title = XP_ITEM_TITLE(tree)
+        title_match = LOT_TITLE_PATTERN.match(''.join(XP_TEXT(title[0])).strip()) if title else None
+        
+        # Current bid after its label, else the first data-currency span
+        bid_span = XP_CURRENT_BID(tree) or XP_FIRST_BID(tree)
+        current_bid = ''.join(XP_TEXT(bid_span[0])).strip() if bid_span else ""
+        
+        time_div = XP_TIME_REMAINING(tree)
+        time_remaining = ''.join(text.strip() for text in XP_TEXT(time_div[0])) if time_div else ""
+        
+        images = [src for src in XP_GALLERY_SRCS(tree) if src]
+        
+        # Anything missing is left to the BeautifulSoup lookups and their fallbacks
+        if not (title_match and current_bid and images
+                and 'H,' in time_remaining and 'M,' in time_remaining and 'S' in time_remaining):
+            return None
+        
+        lot_number = title_match.group(1).strip()
+        description = title_match.group(2).strip()
+        logger.debug(f"Found title text, bid, time remaining and {len(images)} images with XPath")
+        return lot_number, description, current_bid, time_remaining, images
 
     @staticmethod
-    async def find_working_selectors(page, selectors):
-        """Find which selectors actually work on this page"""
+    async def find_working_selectors(page, selectors, soup=None):
+        """Find which selectors actually work on this page, reusing its parsed HTML when given"""
         if not page:
             logger.error("No page available to find working selectors")
             return {}
         
         working_selectors = {}
-        html_content = await page.content()
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if soup is None:
+            html_content = await page.content()
+            soup = BeautifulSoup(html_content, HTML_PARSER)
         
         for element_type, selector_list in selectors.items():
             for selector in selector_list:
                 try:
-                    # For complex CSS selectors with :contains(), we need custom handling
-                    if ':contains' in selector:
-                        # Extract the tag and the text to search for
-                        tag = selector.split(':contains')[0].strip()
-                        search_text = selector.split(':contains(')[1].split(')')[0].strip('"\'')
-                        
-                        # Find elements containing the text
-                        elements = []
-                        for el in soup.find_all(tag):
-                            if search_text in el.text:
-                                elements.append(el)
-                        
-                        count = len(elements)
-                    else:
-                        # Regular CSS selector
-                        elements = soup.select(selector)
-                        count = len(elements)
+                    count = len(ItemExtractor.compile_selector(selector).select(soup))
                     
                     if count > 0:
                         working_selectors[element_type] = selector
@@ -235,8 +331,8 @@ class ItemExtractor:
         return working_selectors
 
     @staticmethod
-    async def get_item_urls(page, working_selectors):
-        """Get the URLs for all items on the page"""
+    async def get_item_urls(page, working_selectors, soup=None):
+        """Get the URLs for all items on the page, reusing its parsed HTML when given"""
         if not page or not working_selectors:
             logger.error("No page or working selectors available")
             return []
@@ -249,34 +345,36 @@ class ItemExtractor:
                 logger.error("Missing required selectors for items or links")
                 return []
             
-            html_content = await page.content()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                html_content = await page.content()
+                soup = BeautifulSoup(html_content, HTML_PARSER)
             
             # Find all items
-            item_elements = soup.select(items_selector)
+            item_elements = ItemExtractor.compile_selector(items_selector).select(soup)
             logger.info(f"Found {len(item_elements)} item elements using selector '{items_selector}'")
             
             item_urls = []
+            seen = set()
             base_url = "https://www.bidrl.com"  # Base URL to prepend to relative URLs
             
             # Process each item to find its URL
+            link_matcher = ItemExtractor.compile_selector(link_selector)
             for item in item_elements:
-                # Find links within this item
-                link_elements = item.select(link_selector)
-                
-                for link in link_elements:
+                # Find links within this item lazily; the walk stops at the first one with an href
+                for link in link_matcher.iselect(item):
                     href = link.get('href')
                     if href:
                         # Make sure it's an absolute URL
                         if href.startswith('/'):
                             href = base_url + href
                         
-                        item_urls.append(href)
-                        logger.debug(f"Found item URL: {href}")
+                        # Skip duplicates as they come, keeping the order items appear on the page
+                        if href not in seen:
+                            seen.add(href)
+                            item_urls.append(href)
+                            logger.debug(f"Found item URL: {href}")
                         break  # Only take the first link per item
             
-            # Remove duplicates
-            item_urls = list(set(item_urls))
             logger.info(f"Found {len(item_urls)} unique item URLs")
             
             return item_urls
@@ -3,51 +3,45 @@ LLM-based search query generator for auction items
 Uses OpenRouter API to generate optimized search queries
 """
 
+import os
 import json
-import re
+import time
+import hashlib
 import aiohttp
 import asyncio
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-from config import OPENROUTER_API_KEY, OPENROUTER_MODEL, OPENROUTER_ENABLED
+try:
+    # Rust-backed JSON encoder/decoder for the OpenRouter payloads and responses
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import OPENROUTER_API_KEY, OPENROUTER_MODEL, OPENROUTER_ENABLED, DATA_DIR
 from utils.logger import setup_logger
+from utils.json_cache import JsonCache
 
 # Set up logger
 logger = setup_logger("LLMQueryGenerator")
 
-class LLMQueryGenerator:
-    """
-    Uses LLM to generate optimized search queries for auction items
-    based on descriptions and OCR text
-    """
-    
-    @staticmethod
-    async def generate_search_query(item: Dict[str, Any]) -> Dict[str, str]:
-        """
-        Generate optimized search queries using LLM
-        
-        Args:
-            item: Auction item data with description and OCR text
-            
-        Returns:
-            Dictionary with generated search queries and product info
-        """
-        try:
-            if not OPENROUTER_ENABLED or not OPENROUTER_API_KEY:
-                logger.warning("OpenRouter API not enabled or missing API key")
-                return {"error": "OpenRouter API not enabled"}
-            
-            # Get input text to analyze
-            input_text = LLMQueryGenerator._prepare_input_text(item)
-            if not input_text.strip():
-                logger.warning("No input text available for LLM analysis")
-                return {"error": "No input text available"}
-                
-            logger.info("Preparing to send request to LLM for query generation")
-            
-            # The prompt template for the LLM
-            prompt_template = """You are an AI assistant specialized in analyzing noisy text from auction item descriptions to accurately identify products.
+# Most OpenRouter requests in flight at once when queries for a batch of items are generated
+MAX_LLM_CONCURRENCY = 32
+
+# Persistent cache of LLM response text, keyed by prompt_key()
+LLM_CACHE_FILE = os.path.join(DATA_DIR, "llm_cache.json")
+LLM_CACHE_VERSION = 1  # Bump when the response handling changes so stale responses are discarded
+LLM_CACHE_MAX_ENTRIES = 5000  # Oldest entries are dropped past this, so the file can't grow without bound
+llm_cache = JsonCache(LLM_CACHE_FILE, LLM_CACHE_VERSION, LLM_CACHE_MAX_ENTRIES)
+
+# Attempts per OpenRouter request when it is rate limited (429), fails on the server (5xx) or the connection drops
+LLM_MAX_ATTEMPTS = 4
+# First retry delay in seconds, doubled on every further attempt unless the server asks for longer
+LLM_RETRY_BASE_DELAY = 1.0
+
+# The prompt sent to the LLM, split around the item text it is built with, so building it
+# is a plain concatenation rather than a str.format() pass over the JSON example's braces
+LLM_PROMPT_PREFIX = """You are an AI assistant specialized in analyzing noisy text from auction item descriptions to accurately identify products.
 
 Context: You will be given raw text extracted via Optical Character Recognition (OCR) from images or descriptions on auction websites. This text is often imperfect and may contain:
 - OCR errors (misspelled words, incorrect characters)
@@ -76,36 +70,135 @@ Instructions:
 IMPORTANT: When you cannot confidently identify the product, brand, or model (confidence below 70%), you MUST mark it as "Unknown". DO NOT guess at specifics when uncertain. If the input is too vague, marking fields as "Unknown" is the correct response.
 
 Input OCR Text:
-{input_text}
+"""
+
+LLM_PROMPT_SUFFIX = """
 
 Output Format:
 Please provide your analysis STRICTLY in the following JSON format:
-{{
+{
   "identified_product_type": "Specific type of product identified or Unknown",
   "brand": "Identified Brand Name or Unknown",
   "model_name_number": "Identified Model Name/Number or Unknown",
   "other_relevant_attributes": "Concise list of other key details, or N/A",
   "google_search_query": "Optimized search string for Google Search, or empty string if too uncertain",
   "amazon_search_query": "Optimized search string for Amazon Search, or empty string if too uncertain"
-}}"""
+}"""
+
+def prompt_key(prompt: str, model: str) -> str:
+    """LLM cache key for a prompt sent to a model; any prompt or model change is a miss"""
+    return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest() + ':' + model
 
+def json_dumps(obj) -> bytes:
+    """Encode obj as UTF-8 JSON, with orjson when it is installed"""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
+def json_loads(data):
+    """Decode JSON text or bytes, with orjson when it is installed"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+class LLMQueryGenerator:
+    """
+    Uses LLM to generate optimized search queries for auction items
+    based on descriptions and OCR text
+    """
+    
+    # One HTTP session for every OpenRouter call, created on first use, so the
+    # TLS connection to openrouter.ai is reused from item to item
+    _session: Optional[aiohttp.ClientSession] = None
+    
+    # Event loop time before which no OpenRouter request is sent. Pushed forward when
+    # the API rate limits a request, so every concurrent call backs off together
+    _paused_until: float = 0.0
+    
+    @staticmethod
+    async def _get_session() -> aiohttp.ClientSession:
+        """Return the shared OpenRouter session, creating it on first use"""
+        if LLMQueryGenerator._session is None or LLMQueryGenerator._session.closed:
+            connector = aiohttp.TCPConnector(limit=64, limit_per_host=32, keepalive_timeout=60)
+            LLMQueryGenerator._session = aiohttp.ClientSession(connector=connector)
+        return LLMQueryGenerator._session
+    
+    @staticmethod
+    async def close():
+        """Close the shared OpenRouter session"""
+        if LLMQueryGenerator._session:
+            await LLMQueryGenerator._session.close()
+            LLMQueryGenerator._session = None
+    
+    @staticmethod
+    async def generate_search_query(item: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate optimized search queries using LLM
+        
+        Args:
+            item: Auction item data with description and OCR text
+            
+        Returns:
+            Dictionary with generated search queries and product info
+        """
+        try:
+            if not OPENROUTER_ENABLED or not OPENROUTER_API_KEY:
+                logger.warning("OpenRouter API not enabled or missing API key")
+                return {"error": "OpenRouter API not enabled"}
+            
+            # Get input text to analyze
+            input_text = LLMQueryGenerator._prepare_input_text(item)
+            if not input_text.strip():
+                logger.warning("No input text available for LLM analysis")
+                return {"error": "No input text available"}
+                
+            logger.info("Preparing to send request to LLM for query generation")
+            
+            prompt = LLM_PROMPT_PREFIX + input_text + LLM_PROMPT_SUFFIX
+            
+            # Identical items produce identical prompts; reuse the response from an earlier call or run
+            cache_key = prompt_key(prompt, OPENROUTER_MODEL)
+            cached_text = llm_cache.get(cache_key)
+            if cached_text is not None:
+                logger.info("Using cached LLM response")
+                return LLMQueryGenerator._process_llm_response({"text": cached_text}, item)
+            
             # Use OpenRouter API to generate queries
-            json_response = await LLMQueryGenerator._call_openrouter_api(
-                prompt_template.format(input_text=input_text)
-            )
+            json_response = await LLMQueryGenerator._call_openrouter_api(prompt)
             
             if not json_response or "error" in json_response:
                 logger.error(f"Error in LLM API response: {json_response.get('error', 'Unknown error')}")
                 return {"error": str(json_response.get('error', 'Unknown error'))}
                 
-            # Extract and process the LLM response
-            return LLMQueryGenerator._process_llm_response(json_response, item)
+            # Extract and process the LLM response, caching it only if it could be used
+            result = LLMQueryGenerator._process_llm_response(json_response, item)
+            if "error" not in result:
+                llm_cache.put(cache_key, json_response["text"])
+            return result
             
         except Exception as e:
             logger.error(f"Error generating search query with LLM: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return {"error": str(e)}
     
+    @staticmethod
+    async def generate_search_queries_batch(items: List[Dict[str, Any]],
+                                            max_concurrency: int = MAX_LLM_CONCURRENCY) -> List[Dict[str, str]]:
+        """
+        Generate search queries for many items concurrently, bounded by a semaphore
+        
+        Args:
+            items: Auction items to generate queries for
+            max_concurrency: Most requests sent to OpenRouter at once
+            
+        Returns:
+            One generate_search_query result per item, in item order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate(item):
+            async with semaphore:
+                return await LLMQueryGenerator.generate_search_query(item)
+        
+        results = await asyncio.gather(*(generate(item) for item in items), return_exceptions=True)
+        return [{"error": str(result)} if isinstance(result, BaseException) else result for result in results]
+    
     @staticmethod
     def _prepare_input_text(item: Dict[str, Any]) -> str:
         """
@@ -193,26 +286,61 @@ Please provide your analysis STRICTLY in the following JSON format:
                     }
                 ],
                 "max_tokens": 1024,
-                "temperature": 0.3  # Lower temperature for more deterministic responses
+                "temperature": 0.3,  # Lower temperature for more deterministic responses
+                # Ask for a bare JSON object; models without JSON mode ignore this and the
+                # response parser still finds the object inside surrounding text
+                "response_format": {"type": "json_object"},
+                # Stream the tokens, so reading can stop as soon as the JSON object is complete
+                "stream": True
             }
             
-            # Make the API request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(api_url, headers=headers, json=payload, timeout=60) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"OpenRouter API request failed: Status {response.status}")
-                        logger.error(f"Error response: {error_text[:200]}")
-                        return {"error": f"API error: {response.status}"}
-                    
-                    result = await response.json()
-            
-            # Extract the response content
-            if result and "choices" in result and len(result["choices"]) > 0:
-                response_text = result["choices"][0]["message"]["content"]
+            # Encoded once, and reused as-is by every retry
+            body = json_dumps(payload)
+            
+            # Make the API request, retrying rate limits, server errors and dropped connections
+            session = await LLMQueryGenerator._get_session()
+            loop = asyncio.get_running_loop()
+            for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+                # Wait out a rate limit pause set by this or any other request
+                pause = LLMQueryGenerator._paused_until - loop.time()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                
+                retry_delay = LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                try:
+                    async with session.post(api_url, headers=headers, data=body, timeout=60) as response:
+                        retryable = response.status == 429 or response.status >= 500
+                        if response.status != 200 and not (retryable and attempt < LLM_MAX_ATTEMPTS):
+                            error_text = await response.text()
+                            logger.error(f"OpenRouter API request failed: Status {response.status}")
+                            logger.error(f"Error response: {error_text[:200]}")
+                            return {"error": f"API error: {response.status}"}
+                        
+                        server_delay = LLMQueryGenerator._server_retry_delay(response.headers)
+                        if response.status == 200:
+                            response_text = await LLMQueryGenerator._read_streamed_json(response)
+                            # Out of requests for this window: hold every call back until it resets
+                            if response.headers.get('X-RateLimit-Remaining') == '0' and server_delay:
+                                LLMQueryGenerator._paused_until = max(LLMQueryGenerator._paused_until, loop.time() + server_delay)
+                            break
+                        
+                        retry_delay = max(retry_delay, server_delay or 0.0)
+                        if response.status == 429:
+                            LLMQueryGenerator._paused_until = max(LLMQueryGenerator._paused_until, loop.time() + retry_delay)
+                        logger.warning(f"OpenRouter API returned status {response.status}, retrying in {retry_delay:.1f}s "
+                                       f"(attempt {attempt}/{LLM_MAX_ATTEMPTS})")
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == LLM_MAX_ATTEMPTS:
+                        raise
+                    logger.warning(f"OpenRouter API request failed: {e!r}, retrying in {retry_delay:.1f}s "
+                                   f"(attempt {attempt}/{LLM_MAX_ATTEMPTS})")
+                
+                await asyncio.sleep(retry_delay)
+            
+            if response_text:
                 return {"text": response_text}
             else:
-                logger.error(f"Unexpected API response format: {result}")
+                logger.error("OpenRouter API response had no content")
                 return {"error": "Invalid response format"}
                 
         except Exception as e:
@@ -220,6 +348,96 @@ Please provide your analysis STRICTLY in the following JSON format:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return {"error": str(e)}
     
+    @staticmethod
+    async def _read_streamed_json(response: aiohttp.ClientResponse) -> str:
+        """
+        Read a streamed chat completion up to the end of the first JSON object in it
+        
+        The object is tracked by brace depth, skipping braces inside JSON strings. Once it
+        closes, the rest of the stream is read to [DONE] without being parsed, so the
+        connection goes back to the pool for the next request.
+        
+        Args:
+            response: Response to a request sent with "stream": true
+            
+        Returns:
+            The content received, or an empty string if the stream had none
+        """
+        parts = []
+        depth = 0
+        in_string = escaped = complete = False
+        async for line in response.content:
+            # Server-sent events: "data: {...}" chunks, blank separators and ": ..." keep-alive comments
+            line = line.strip()
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                break
+            if complete:
+                continue
+            
+            chunk = json_loads(data)
+            if 'error' in chunk:
+                raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+            choices = chunk.get('choices') or []
+            content = (choices[0].get('delta') or {}).get('content') if choices else None
+            if not content:
+                continue
+            parts.append(content)
+            
+            for char in content:
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == '\\':
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = depth > 0
+                elif char == '{':
+                    depth += 1
+                elif char == '}' and depth:
+                    depth -= 1
+                    if not depth:
+                        # The object is complete; the rest of the stream is only drained
+                        complete = True
+                        break
+        return ''.join(parts)
+    
+    @staticmethod
+    def _server_retry_delay(headers) -> Optional[float]:
+        """
+        Seconds the API asks callers to wait, from its Retry-After or X-RateLimit-Reset header
+        
+        Args:
+            headers: Response headers
+            
+        Returns:
+            Delay in seconds, or None if the response gives no hint
+        """
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        
+        reset = headers.get('X-RateLimit-Reset')
+        if reset:
+            try:
+                reset = float(reset)
+            except ValueError:
+                return None
+            # OpenRouter reports the reset as a Unix timestamp in milliseconds
+            if reset > 1e12:
+                reset /= 1000
+            if reset > 1e9:
+                return max(reset - time.time(), 0.0)
+            return max(reset, 0.0)
+        return None
+    
     @staticmethod
     def _process_llm_response(response: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -238,18 +456,20 @@ Please provide your analysis STRICTLY in the following JSON format:
             
             response_text = response["text"]
             
-            # Extract JSON from the response
-            json_pattern = r'({[\s\S]*})'
-            json_matches = re.search(json_pattern, response_text)
+            # Extract JSON from the response: the span from the first "{" to the last "}",
+            # found with two linear scans instead of a backtracking regex
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}')
             
-            if not json_matches:
+            if json_start < 0 or json_end < json_start:
                 logger.warning(f"Could not find JSON in response: {response_text[:100]}...")
                 return {"error": "No JSON in response"}
             
-            json_str = json_matches.group(1)
+            json_str = response_text[json_start:json_end + 1]
             
             try:
-                data = json.loads(json_str)
+                # orjson's decode error subclasses json.JSONDecodeError
+                data = json_loads(json_str)
             except json.JSONDecodeError:
                 logger.warning(f"Could not parse JSON: {json_str[:100]}...")
                 return {"error": "Invalid JSON in response"}
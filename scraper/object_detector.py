@@ -5,35 +5,157 @@ Object detection and product information extraction using computer vision
 import os
 import re
 import cv2
-import time
 import numpy as np
 import asyncio
 import traceback
 import base64
+import hashlib
 from io import BytesIO
 from PIL import Image
 import aiohttp
 import requests
 import json
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
-from config import IMAGES_DIR, GOOGLE_API_KEY, CLOUD_VISION_ENABLED
+from config import IMAGES_DIR, DATA_DIR, GOOGLE_API_KEY, CLOUD_VISION_ENABLED, OPENCV_FALLBACK_ONLY
 from utils.logger import setup_logger
-from utils.file_utils import generate_image_filepath
+from utils.file_utils import generate_image_filepath, item_file_id
+from utils.json_cache import JsonCache
 
 # Set up logger
 logger = setup_logger("ObjectDetector")
 
+# Image decoding and the OpenCV pipeline are CPU-bound; OpenCV releases the GIL,
+# so run them on threads sized to the CPUs this process may run on, keeping the
+# event loop free for Vision requests and the other items' work
+CV_WORKERS = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+_CV_POOL = ThreadPoolExecutor(max_workers=CV_WORKERS, thread_name_prefix="opencv")
+
+# Most images of one item analyzed at once
+MAX_CONCURRENT_DETECTIONS = 8
+
+# Most images the Cloud Vision images:annotate endpoint accepts in one request
+VISION_BATCH_SIZE = 16
+
+# URL schemes Cloud Vision can fetch an image from itself (source.imageUri)
+VISION_URI_SCHEMES = ('http://', 'https://', 'gs://')
+
+# Local images uploaded to Cloud Vision are downsized to fit this many pixels per
+# side and re-encoded as JPEG at this quality
+VISION_MAX_DIM = 1024
+VISION_JPEG_QUALITY = 85
+
+# Features requested from Cloud Vision for every image
+VISION_FEATURES = [
+    {"type": "OBJECT_LOCALIZATION", "maxResults": 10},
+    {"type": "LOGO_DETECTION", "maxResults": 5},
+    {"type": "TEXT_DETECTION", "maxResults": 20},
+    {"type": "LABEL_DETECTION", "maxResults": 10},
+    {"type": "IMAGE_PROPERTIES", "maxResults": 5}
+]
+
+# Dominant colors are found by K-means over a (width, height) downsampled copy of the image
+KMEANS_SAMPLE_SIZE = (128, 128)
+KMEANS_MAX_ITER = 20     # Iterations per attempt
+KMEANS_EPSILON = 1.0     # Stop once centers move less than this (0-255 color units)
+KMEANS_ATTEMPTS = 3      # Restarts from random centers, keeping the best
+
+# Palette colors are named by closest match (Euclidean distance in RGB)
+COLOR_PALETTE = {
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'yellow': (255, 255, 0),
+    'purple': (128, 0, 128),
+    'orange': (255, 165, 0),
+    'pink': (255, 192, 203),
+    'gray': (128, 128, 128),
+    'brown': (165, 42, 42),
+    'silver': (192, 192, 192),
+    'gold': (255, 215, 0)
+}
+COLOR_PALETTE_NAMES = list(COLOR_PALETTE)
+COLOR_PALETTE_RGB = np.array(list(COLOR_PALETTE.values()), dtype=np.float32)
+
+# Common model number patterns (matched case-insensitively)
+MODEL_NUMBER_PATTERNS = [
+    # General patterns
+    r'^[A-Za-z]{1,4}-?\d{2,6}$',                # ABC-123, SM-G970
+    r'^[A-Za-z]{2,4}\d{2,4}[A-Za-z]?$',         # TX550, RTX3080, TX550i
+    r'^[A-Z]{2,8}\d{4,8}$',                     # SKGJ5678 (SKU-like)
+    r'^\d{1,4}[A-Za-z]{1,3}\d{1,4}$',           # 55UH6150
+    r'^[A-Za-z]\d{1,2}-\d{1,4}[A-Za-z]?$',      # A8-3500M
+    r'^[A-Za-z]{2,4}-[A-Za-z]\d{1,4}$',         # GTX-X570
+    
+    # Common specific patterns for various brands
+    r'^(UN|QN|LN)\d{2}[A-Z]\d{4}[A-Z]$',        # Samsung TV: UN55NU7100F
+    r'^[A-Z]{2}-[A-Z]\d{4}[A-Z]$',              # Sony TV: XBR-X900H
+    r'^(MH|ML|MS|MP)\d{2,4}[A-Z]?$',            # LG Appliances: MH12345A
+    r'^[A-Z]{3}\d{4}[A-Z]{1,2}$',               # Whirlpool: WRF535SMBM
+    r'^[A-Z]{2}\d{2,4}[A-Z]{0,2}$',             # DeWalt tools: DC725
+    r'^(SM-[A-Z]\d{3,4}|Galaxy\s?S\d{1,2})$',   # Samsung phones: SM-G975, Galaxy S10
+    r'^iPhone\s?\d{1,2}$',                      # iPhones: iPhone 12
+    r'^[A-Z]{1,2}\d{1,3}-(BT|XT|LT)$',          # Bluetooth devices: M50-BT
+    r'^[A-Z]{2,4}-\d{2,4}[A-Z]?-[A-Z]{1,2}$',   # PC Parts: ROG-570X-F
+    r'^([A-Z]{2,3}-\d{3,5}|\d{2,3}-\d{3})$',    # Cameras: EOS-250D, 70-200
+    
+    # UPC and similar patterns
+    r'^\d{12,13}$',                             # UPC/EAN: 123456789012
+    r'^\d{3}-\d{3}-\d{4}$',                     # Formatted number: 123-456-7890 
+]
+MODEL_NUMBER_REGEX = re.compile('|'.join(f'(?:{pattern})' for pattern in MODEL_NUMBER_PATTERNS), re.IGNORECASE)
+
+# Plain alphanumeric token, checked for a mix of letters and digits
+ALPHANUMERIC_REGEX = re.compile(r'^[A-Za-z0-9]+$')
+
+# Persistent cache of detection results, keyed by content_key()
+DETECTION_CACHE_FILE = os.path.join(DATA_DIR, "detection_cache.json")
+DETECTION_CACHE_VERSION = 1  # Bump when Vision parsing or OpenCV detection changes so stale results are discarded
+DETECTION_CACHE_MAX_ENTRIES = 20000  # Oldest entries are dropped past this, so the file can't grow without bound
+detection_cache = JsonCache(DETECTION_CACHE_FILE, DETECTION_CACHE_VERSION, DETECTION_CACHE_MAX_ENTRIES)
+
+def content_key(data, mode):
+    """Detection cache key for image bytes, shared by identical images across lots; mode names the detection methods used"""
+    return f"blake2b:{hashlib.blake2b(data, digest_size=16).hexdigest()}:{mode}"
+
 class ObjectDetector:
     """
     Detects objects, brands, and product information from images using
     multiple computer vision approaches
     """
     
+    # One HTTP session for every Cloud Vision call, created on first use, so the
+    # TLS connection to vision.googleapis.com is reused from item to item
+    _session: Optional[aiohttp.ClientSession] = None
+    
+    @staticmethod
+    async def _get_session() -> aiohttp.ClientSession:
+        """Return the shared Cloud Vision session, creating it on first use"""
+        if ObjectDetector._session is None or ObjectDetector._session.closed:
+            # Batched requests mean few connections are needed; keep them and the DNS
+            # lookup alive between items instead of reconnecting per request
+            connector = aiohttp.TCPConnector(limit=16, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=60)
+            ObjectDetector._session = aiohttp.ClientSession(connector=connector)
+        return ObjectDetector._session
+    
     @staticmethod
-    async def detect_objects_in_image(image_path, image_url=None):
+    async def close():
+        """Close the shared Cloud Vision session"""
+        if ObjectDetector._session:
+            await ObjectDetector._session.close()
+            ObjectDetector._session = None
+    
+    @staticmethod
+    async def detect_objects_in_image(image_path, image_url=None, vision_results=None):
         """
         Detect objects, text, and logos in an image using multiple detection methods
         
+        vision_results holds this image's already fetched Cloud Vision results
+        (falsy if the lookup failed); when None, Cloud Vision is queried here.
+        
         Returns a dict with detected information
         """
         try:
@@ -46,34 +168,38 @@ class ObjectDetector:
                 'confidence': 0.0  # Overall confidence score
             }
             
-            # Load the image
-            image = Image.open(image_path)
-            cv_image = cv2.imread(image_path)
-            
             # Method 1: Use Google Cloud Vision API if enabled
-            if CLOUD_VISION_ENABLED and GOOGLE_API_KEY:
+            if vision_results is None and CLOUD_VISION_ENABLED and GOOGLE_API_KEY:
                 try:
-                    vision_results = await ObjectDetector._analyze_with_google_vision(image_path, image_url)
-                    if vision_results:
-                        # Merge vision API results with our results
-                        for key in results:
-                            if key in vision_results and vision_results[key]:
-                                results[key].extend(vision_results[key])
+                    vision_results = (await ObjectDetector._analyze_batch_with_google_vision(
+                        [image_path], [image_url]))[0]
                 except Exception as e:
                     logger.error(f"Error with Google Vision API: {e}")
-            
-            # Method 2: Local object detection using OpenCV and pre-trained models
-            opencv_results = ObjectDetector._detect_with_opencv(cv_image)
-            if opencv_results:
-                # Merge OpenCV results
+            if vision_results:
+                # Merge vision API results with our results
                 for key in results:
-                    if key in opencv_results and opencv_results[key]:
-                        results[key].extend(opencv_results[key])
-            
-            # Remove duplicates from all result lists
+                    if key in vision_results and vision_results[key]:
+                        results[key].extend(vision_results[key])
+            
+            # Method 2: Local object detection using OpenCV and pre-trained models; with
+            # OPENCV_FALLBACK_ONLY it only runs when Vision found no objects or colors
+            vision_succeeded = bool(vision_results and (vision_results.get('objects') or vision_results.get('colors')))
+            if not (OPENCV_FALLBACK_ONLY and vision_succeeded):
+                # Decode and analyze the image on the OpenCV pool, off the event loop
+                loop = asyncio.get_running_loop()
+                cv_image = await loop.run_in_executor(_CV_POOL, ObjectDetector._load_image, image_path)
+                opencv_results = await loop.run_in_executor(_CV_POOL, ObjectDetector._detect_with_opencv, cv_image)
+                if opencv_results:
+                    # Merge OpenCV results
+                    for key in results:
+                        if key in opencv_results and opencv_results[key]:
+                            results[key].extend(opencv_results[key])
+            
+            # Remove duplicates from all result lists, keeping the first occurrence so
+            # Vision's ranking (most confident first) survives
             for key in results:
                 if isinstance(results[key], list):
-                    results[key] = list(set(results[key]))
+                    results[key] = list(dict.fromkeys(results[key]))
             
             # Calculate confidence based on number of detections
             total_detections = sum(len(results[key]) for key in ['objects', 'brands', 'model_info'])
@@ -88,124 +214,169 @@ class ObjectDetector:
             return None
     
     @staticmethod
-    async def _analyze_with_google_vision(image_path, image_url=None):
+    def _detection_cache_key(image_path, with_vision):
+        """Detection cache key for an image file's contents, or None if it can't be read"""
+        # Results differ by which detection methods ran, so each combination is cached apart
+        if not with_vision:
+            mode = "opencv"
+        else:
+            mode = "vision" if OPENCV_FALLBACK_ONLY else "vision+opencv"
+        try:
+            with open(image_path, "rb") as image_file:
+                return content_key(image_file.read(), mode)
+        except OSError as e:
+            logger.warning(f"Could not read {image_path} for the detection cache: {e}")
+            return None
+    
+    @staticmethod
+    def _load_image(image_path):
+        """Load an image file as an OpenCV BGR array"""
+        # Formats OpenCV can't read (e.g. GIF) go through PIL, normalised to RGB
+        cv_image = cv2.imread(image_path)
+        if cv_image is None:
+            with Image.open(image_path) as image:
+                cv_image = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+        return cv_image
+    
+    @staticmethod
+    async def _analyze_batch_with_google_vision(image_paths, image_urls):
         """
-        Analyze image using Google Cloud Vision API 
+        Analyze images using Google Cloud Vision API, up to VISION_BATCH_SIZE per request
         
-        Can use either local image or remote URL
+        Each image is sent by its remote URL when it has one, otherwise as its local file.
+        Returns one result dict per image, in order, with None where the analysis failed.
         """
         if not GOOGLE_API_KEY:
             logger.warning("Google API key not provided for Cloud Vision API")
-            return None
-            
-        try:
-            logger.info("Analyzing image with Google Cloud Vision API")
-            
-            # Prepare the request
-            api_url = f"https://vision.googleapis.com/v1/images:annotate?key={GOOGLE_API_KEY}"
-            
-            # If we have a URL, use it directly (more efficient)
-            if image_url:
-                image_content = {"source": {"imageUri": image_url}}
-            else:
-                # Otherwise encode the image
-                with open(image_path, "rb") as image_file:
-                    encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
-                image_content = {"content": encoded_image}
-            
-            # Build request with all feature types
-            post_data = {
-                "requests": [
-                    {
-                        "image": image_content,
-                        "features": [
-                            {"type": "OBJECT_LOCALIZATION", "maxResults": 10},
-                            {"type": "LOGO_DETECTION", "maxResults": 5},
-                            {"type": "TEXT_DETECTION", "maxResults": 20},
-                            {"type": "LABEL_DETECTION", "maxResults": 10},
-                            {"type": "IMAGE_PROPERTIES", "maxResults": 5}
-                        ]
-                    }
-                ]
-            }
-            
-            # Make the API request
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(api_url, json=post_data, headers=headers) as response:
+            return [None] * len(image_paths)
+        
+        results = []
+        for start in range(0, len(image_paths), VISION_BATCH_SIZE):
+            chunk_paths = image_paths[start:start + VISION_BATCH_SIZE]
+            chunk_urls = image_urls[start:start + VISION_BATCH_SIZE]
+            chunk_results = [None] * len(chunk_paths)
+            try:
+                logger.info(f"Analyzing {len(chunk_paths)} images with Google Cloud Vision API")
+                
+                # Prepare the request
+                api_url = f"https://vision.googleapis.com/v1/images:annotate?key={GOOGLE_API_KEY}"
+                
+                requests_data = []
+                for image_path, image_url in zip(chunk_paths, chunk_urls):
+                    # If we have a URL Vision can fetch itself, use it directly so the image
+                    # isn't uploaded again as base64 (a third larger than the file)
+                    if image_url and image_url.startswith(VISION_URI_SCHEMES):
+                        image_content = {"source": {"imageUri": image_url}}
+                    else:
+                        # Otherwise encode the image (downsized), off the event loop
+                        encoded_image = await asyncio.to_thread(ObjectDetector._encode_image_file, image_path)
+                        image_content = {"content": encoded_image}
+                    requests_data.append({"image": image_content, "features": VISION_FEATURES})
+                
+                # Make the API request
+                headers = {
+                    "Content-Type": "application/json",
+                    "Accept": "application/json"
+                }
+                
+                session = await ObjectDetector._get_session()
+                async with session.post(api_url, json={"requests": requests_data}, headers=headers) as response:
                     if response.status != 200:
                         logger.error(f"Google Vision API request failed: {response.status}")
                         logger.error(await response.text())
-                        return None
-                    
-                    response_data = await response.json()
-            
-            # Extract relevant information from the response
-            results = {
-                'objects': [],
-                'brands': [],
-                'model_info': [],
-                'colors': [],
-                'text': [],
-                'confidence': 0.0
-            }
-            
-            # Extract detected objects
-            if 'responses' in response_data and response_data['responses']:
-                response = response_data['responses'][0]
+                        response_data = {}
+                    else:
+                        response_data = await response.json()
                 
-                # Get objects
-                if 'localizedObjectAnnotations' in response:
-                    for obj in response['localizedObjectAnnotations']:
-                        results['objects'].append(obj['name'].lower())
-                        
-                # Get logos (brands)
-                if 'logoAnnotations' in response:
-                    for logo in response['logoAnnotations']:
-                        results['brands'].append(logo['description'].lower())
+                # Responses come back in request order
+                for i, image_response in enumerate(response_data.get('responses', [])[:len(chunk_paths)]):
+                    if 'error' in image_response:
+                        logger.warning(f"Google Vision API could not analyze image: {image_response['error'].get('message')}")
+                        continue
+                    chunk_results[i] = ObjectDetector._parse_vision_response(image_response)
                 
-                # Extract text
-                if 'textAnnotations' in response:
-                    all_text = []
-                    
-                    # Skip the first item, which is the entire text block
-                    for text_item in response['textAnnotations'][1:] if response['textAnnotations'] else []:
-                        text = text_item['description'].lower()
-                        
-                        # Look for model numbers and SKUs
-                        if ObjectDetector._is_model_number(text):
-                            results['model_info'].append(text)
-                        else:
-                            # Add to general text
-                            all_text.append(text)
-                    
-                    # Combine all text
-                    results['text'] = all_text
+            except Exception as e:
+                logger.error(f"Error with Google Vision API: {e}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+            
+            results.extend(chunk_results)
+        
+        return results
+    
+    @staticmethod
+    def _encode_image_file(image_path):
+        """Read an image file and return it base64 encoded for a Vision request, downsized to VISION_MAX_DIM"""
+        # Only the header is read to get the size; small enough images are sent as they are
+        with Image.open(image_path) as image:
+            width, height = image.size
+        scale = VISION_MAX_DIM / max(width, height)
+        if scale >= 1:
+            with open(image_path, "rb") as image_file:
+                return base64.b64encode(image_file.read()).decode('ascii')
+        
+        # Vision analyzes images at about this size anyway, so upload a smaller JPEG
+        cv_image = ObjectDetector._load_image(image_path)
+        cv_image = cv2.resize(cv_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode('.jpg', cv_image, [cv2.IMWRITE_JPEG_QUALITY, VISION_JPEG_QUALITY])
+        return base64.b64encode(buffer).decode('ascii')
+    
+    @staticmethod
+    def _parse_vision_response(response):
+        """Extract objects, brands, model numbers, text and colors from one Cloud Vision image response"""
+        results = {
+            'objects': [],
+            'brands': [],
+            'model_info': [],
+            'colors': [],
+            'text': [],
+            'confidence': 0.0
+        }
+        
+        # Get objects
+        if 'localizedObjectAnnotations' in response:
+            for obj in response['localizedObjectAnnotations']:
+                results['objects'].append(obj['name'].lower())
                 
-                # Get colors
-                if 'imagePropertiesAnnotation' in response:
-                    if 'dominantColors' in response['imagePropertiesAnnotation']:
-                        for color in response['imagePropertiesAnnotation']['dominantColors']['colors'][:3]:
-                            # Get RGB values
-                            r = int(color['color']['red'])
-                            g = int(color['color']['green'])
-                            b = int(color['color']['blue'])
-                            
-                            # Convert to color name (simple approximation)
-                            color_name = ObjectDetector._get_color_name(r, g, b)
-                            if color_name:
-                                results['colors'].append(color_name)
+        # Get logos (brands)
+        if 'logoAnnotations' in response:
+            for logo in response['logoAnnotations']:
+                results['brands'].append(logo['description'].lower())
+        
+        # Extract text
+        if 'textAnnotations' in response:
+            all_text = []
             
-            return results
+            # Skip the first item, which is the entire text block
+            for text_item in response['textAnnotations'][1:] if response['textAnnotations'] else []:
+                text = text_item['description'].lower()
+                
+                # Look for model numbers and SKUs
+                if ObjectDetector._is_model_number(text):
+                    results['model_info'].append(text)
+                else:
+                    # Add to general text
+                    all_text.append(text)
             
-        except Exception as e:
-            logger.error(f"Error with Google Vision API: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
+            # Combine all text
+            results['text'] = all_text
+        
+        # Get colors
+        if 'imagePropertiesAnnotation' in response:
+            if 'dominantColors' in response['imagePropertiesAnnotation']:
+                dominant_colors = response['imagePropertiesAnnotation']['dominantColors']['colors'][:3]
+                if dominant_colors:
+                    # Get RGB values; Vision leaves out components that are zero
+                    rgb_values = [
+                        [int(color['color'].get(channel, 0)) for channel in ('red', 'green', 'blue')]
+                        for color in dominant_colors
+                    ]
+                    
+                    # Convert to color names (simple approximation)
+                    for color_name in ObjectDetector._get_color_names_batch(rgb_values):
+                        if color_name:
+                            results['colors'].append(color_name)
+        
+        return results
     
     @staticmethod
     def _detect_with_opencv(cv_image):
@@ -239,18 +410,17 @@ class ObjectDetector:
             cv_image = cv_image[0:crop_height, 0:w]
             
             # Get dominant colors using OpenCV
-            # Convert to HSV for better color detection
-            img_hsv = cv2.cvtColor(cv_image, cv2.COLOR_BGR2HSV)
-            
-            # Create color histogram - using K-means for more accurate color detection
-            pixels = cv_image.reshape((-1, 3))
-            pixels = np.float32(pixels)
+            # Create color histogram - using K-means for more accurate color detection.
+            # Dominant colors survive heavy downsampling, so cluster a small
+            # area-averaged copy instead of every pixel
+            sample = cv2.resize(cv_image, KMEANS_SAMPLE_SIZE, interpolation=cv2.INTER_AREA)
+            pixels = np.float32(sample.reshape((-1, 3)))
             
             # Define criteria for K-means
-            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
+            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, KMEANS_MAX_ITER, KMEANS_EPSILON)
             k = 5  # Number of dominant colors to extract
             
-            _, labels, centers = cv2.kmeans(pixels, k, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
+            _, labels, centers = cv2.kmeans(pixels, k, None, criteria, KMEANS_ATTEMPTS, cv2.KMEANS_RANDOM_CENTERS)
             
             # Get the most dominant colors - centers represent RGB colors
             # Count pixels in each cluster
@@ -258,13 +428,9 @@ class ObjectDetector:
             # Sort clusters by size (most dominant first)
             color_indices = np.argsort(-count)
             
-            # Get top 3 colors
-            for i in range(min(3, len(color_indices))):
-                center = centers[color_indices[i]]
-                rgb_color = center[::-1]  # Convert BGR to RGB
-                
-                # Get color name
-                color_name = ObjectDetector._get_color_name(rgb_color[0], rgb_color[1], rgb_color[2])
+            # Get names for the top 3 colors, converting the centers from BGR to RGB
+            top_colors = centers[color_indices[:3]][:, ::-1]
+            for color_name in ObjectDetector._get_color_names_batch(top_colors):
                 if color_name:
                     results['colors'].append(color_name)
             
@@ -280,17 +446,21 @@ class ObjectDetector:
             else:
                 results['objects'].append('square_item')
             
-            # Detect edges and contours
+            # Detect edges and contours, reusing the grayscale and edge buffers in place.
+            # Texture variance is taken from the gray image before it is blurred, and
+            # edge pixels are counted before gaps are closed
             gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-            edges = cv2.Canny(blurred, 50, 150)
+            _, gray_stddev = cv2.meanStdDev(gray)
+            cv2.GaussianBlur(gray, (5, 5), 0, dst=gray)
+            edges = cv2.Canny(gray, 50, 150)
+            edge_pixels = cv2.countNonZero(edges)
             
             # Morphological operations to close gaps
             kernel = np.ones((3, 3), np.uint8)
-            closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+            cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, dst=edges)
             
             # Find contours
-            contours, hierarchy = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            contours, hierarchy = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             # Analyze contours by shape
             rectangles = 0
@@ -298,11 +468,14 @@ class ObjectDetector:
             triangles = 0
             irregular = 0
             
-            for contour in contours:
-                # Filter out very small contours
-                area = cv2.contourArea(contour)
-                if area < (width * height * 0.01):  # Less than 1% of image
-                    continue
+            # Filter out very small contours (less than 1% of image) up front, so only
+            # the few large ones reach the shape analysis
+            min_area = width * height * 0.01
+            areas = np.fromiter((cv2.contourArea(contour) for contour in contours), dtype=np.float64, count=len(contours))
+            
+            for index in np.flatnonzero(areas >= min_area):
+                contour = contours[index]
+                area = areas[index]
                 
                 # Approximate contour to get shape
                 epsilon = 0.04 * cv2.arcLength(contour, True)
@@ -339,13 +512,14 @@ class ObjectDetector:
                 results['objects'].append('structured_object')
             
             # Texture analysis - check if item is shiny/metallic
-            gray_variance = np.var(gray)
+            gray_variance = gray_stddev[0, 0] ** 2
             if gray_variance > 3000:  # High variance often indicates shiny objects
                 results['objects'].append('reflective_object')
             
             # Check for text-rich images
-            # Use simple edge density in regions as a proxy
-            edge_density = np.sum(edges) / (edges.shape[0] * edges.shape[1])
+            # Use simple edge density in regions as a proxy. Canny marks edge pixels 255 and
+            # the threshold was tuned on the mean of that map, i.e. the edge fraction x 255
+            edge_density = edge_pixels * 255 / edges.size
             if edge_density > 0.1:  # Threshold determined empirically
                 results['objects'].append('text_heavy_object')
             
@@ -361,34 +535,15 @@ class ObjectDetector:
     @staticmethod
     def _get_color_name(r, g, b):
         """Convert RGB values to color name"""
-        # Simple color detection by closest match
-        colors = {
-            'red': (255, 0, 0),
-            'green': (0, 255, 0),
-            'blue': (0, 0, 255),
-            'black': (0, 0, 0),
-            'white': (255, 255, 255),
-            'yellow': (255, 255, 0),
-            'purple': (128, 0, 128),
-            'orange': (255, 165, 0),
-            'pink': (255, 192, 203),
-            'gray': (128, 128, 128),
-            'brown': (165, 42, 42),
-            'silver': (192, 192, 192),
-            'gold': (255, 215, 0)
-        }
-        
-        min_distance = float('inf')
-        closest_color = None
-        
-        for color_name, color_rgb in colors.items():
-            # Calculate Euclidean distance
-            distance = sum((c1 - c2) ** 2 for c1, c2 in zip((r, g, b), color_rgb)) ** 0.5
-            if distance < min_distance:
-                min_distance = distance
-                closest_color = color_name
-        
-        return closest_color
+        return ObjectDetector._get_color_names_batch([(r, g, b)])[0]
+    
+    @staticmethod
+    def _get_color_names_batch(rgb_array):
+        """Convert an (N, 3) array of RGB values to the closest palette color names"""
+        # Squared Euclidean distance from every color to every palette entry, in one pass
+        rgb = np.asarray(rgb_array, dtype=np.float32).reshape(-1, 1, 3)
+        distances = ((rgb - COLOR_PALETTE_RGB) ** 2).sum(axis=-1)
+        return [COLOR_PALETTE_NAMES[i] for i in distances.argmin(axis=-1)]
     
     @staticmethod
     def _is_model_number(text):
@@ -406,40 +561,12 @@ class ObjectDetector:
         if not text or len(text) < 3:
             return False
             
-        # Common model number patterns
-        patterns = [
-            # General patterns
-            r'^[A-Za-z]{1,4}-?\d{2,6}$',                # ABC-123, SM-G970
-            r'^[A-Za-z]{2,4}\d{2,4}[A-Za-z]?$',         # TX550, RTX3080, TX550i
-            r'^[A-Z]{2,8}\d{4,8}$',                     # SKGJ5678 (SKU-like)
-            r'^\d{1,4}[A-Za-z]{1,3}\d{1,4}$',           # 55UH6150
-            r'^[A-Za-z]\d{1,2}-\d{1,4}[A-Za-z]?$',      # A8-3500M
-            r'^[A-Za-z]{2,4}-[A-Za-z]\d{1,4}$',         # GTX-X570
-            
-            # Common specific patterns for various brands
-            r'^(UN|QN|LN)\d{2}[A-Z]\d{4}[A-Z]$',        # Samsung TV: UN55NU7100F
-            r'^[A-Z]{2}-[A-Z]\d{4}[A-Z]$',              # Sony TV: XBR-X900H
-            r'^(MH|ML|MS|MP)\d{2,4}[A-Z]?$',            # LG Appliances: MH12345A
-            r'^[A-Z]{3}\d{4}[A-Z]{1,2}$',               # Whirlpool: WRF535SMBM
-            r'^[A-Z]{2}\d{2,4}[A-Z]{0,2}$',             # DeWalt tools: DC725
-            r'^(SM-[A-Z]\d{3,4}|Galaxy\s?S\d{1,2})$',   # Samsung phones: SM-G975, Galaxy S10
-            r'^iPhone\s?\d{1,2}$',                      # iPhones: iPhone 12
-            r'^[A-Z]{1,2}\d{1,3}-(BT|XT|LT)$',          # Bluetooth devices: M50-BT
-            r'^[A-Z]{2,4}-\d{2,4}[A-Z]?-[A-Z]{1,2}$',   # PC Parts: ROG-570X-F
-            r'^([A-Z]{2,3}-\d{3,5}|\d{2,3}-\d{3})$',    # Cameras: EOS-250D, 70-200
-            
-            # UPC and similar patterns
-            r'^\d{12,13}$',                             # UPC/EAN: 123456789012
-            r'^\d{3}-\d{3}-\d{4}$',                     # Formatted number: 123-456-7890 
-        ]
-        
-        # Check against patterns
-        for pattern in patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-                
+        # Check against the model number patterns, compiled once as a single alternation
+        if MODEL_NUMBER_REGEX.match(text):
+            return True
+        
         # Check if alphanumeric with a good mix of letters and numbers
-        if re.match(r'^[A-Za-z0-9]+$', text):
+        if ALPHANUMERIC_REGEX.match(text):
             # Count letters and numbers
             letters = sum(c.isalpha() for c in text)
             numbers = sum(c.isdigit() for c in text)
@@ -475,51 +602,80 @@ class ObjectDetector:
             'additional_text': []
         }
         
-        lot_id = item.get('lotNumber', '').replace(' ', '_').replace('#', '').replace(':', '')
-        if not lot_id:
-            lot_id = f"unknown_{int(time.time())}"
+        lot_id = item_file_id(item)
         
         # Process each image, excluding the last one
         images_for_detection = images[:-1] if len(images) > 1 else images
         
+        # Only analyze images whose file exists
+        targets = []
         for i, img_url in enumerate(images_for_detection):
+            image_filepath = generate_image_filepath(lot_id, i+1)
+            if os.path.exists(image_filepath):
+                targets.append((i, image_filepath, img_url))
+            else:
+                logger.warning(f"Image file not found at {image_filepath}")
+        
+        # Identical images (e.g. stock photos repeated across lots) reuse earlier results
+        vision_enabled = bool(CLOUD_VISION_ENABLED and GOOGLE_API_KEY)
+        cache_keys = await asyncio.gather(
+            *(asyncio.to_thread(ObjectDetector._detection_cache_key, path, vision_enabled) for _, path, _ in targets)
+        )
+        cached_results = [detection_cache.get(key) if key else None for key in cache_keys]
+        uncached = [j for j, cached in enumerate(cached_results) if cached is None]
+        
+        # Fetch Cloud Vision results for the item's uncached images in batched requests
+        vision_batch = [{}] * len(targets)
+        if uncached and vision_enabled:
             try:
-                # Generate the local image path
-                image_filepath = generate_image_filepath(lot_id, i+1)
-                
-                # Only analyze if file exists
-                if os.path.exists(image_filepath):
-                    logger.info(f"Analyzing image {i+1}/{len(images_for_detection)} for object detection")
-                    
-                    # Detect objects in the image
-                    results = await ObjectDetector.detect_objects_in_image(image_filepath, img_url)
-                    
-                    if results:
-                        # Merge results
-                        detection_results['detected_objects'].extend(results.get('objects', []))
-                        detection_results['detected_brands'].extend(results.get('brands', []))
-                        detection_results['model_numbers'].extend(results.get('model_info', []))
-                        detection_results['colors'].extend(results.get('colors', []))
-                        detection_results['additional_text'].extend(results.get('text', []))
-                        
-                        logger.info(f"Detection results for image {i+1}: " + 
-                                    f"{len(results.get('objects', []))} objects, " +
-                                    f"{len(results.get('brands', []))} brands")
-                    else:
-                        logger.warning(f"No detection results for image {i+1}")
-                else:
-                    logger.warning(f"Image file not found at {image_filepath}")
-                    
-                # Add delay to avoid overloading APIs
-                await asyncio.sleep(0.5)
-                
+                fetched = await ObjectDetector._analyze_batch_with_google_vision(
+                    [targets[j][1] for j in uncached], [targets[j][2] for j in uncached])
+                for j, vision_results in zip(uncached, fetched):
+                    vision_batch[j] = vision_results
             except Exception as e:
-                logger.error(f"Error processing image {i+1} for object detection: {e}")
+                logger.error(f"Error with Google Vision API: {e}")
                 logger.error(f"Traceback: {traceback.format_exc()}")
         
-        # Remove duplicates
+        # Analyze the images concurrently; the OpenCV work is spread over _CV_POOL
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DETECTIONS)
+        
+        async def detect(j):
+            i, image_filepath, img_url = targets[j]
+            if cached_results[j] is not None:
+                logger.info(f"Using cached detection results for image {i+1}/{len(images_for_detection)}")
+                return cached_results[j]
+            async with semaphore:
+                logger.info(f"Analyzing image {i+1}/{len(images_for_detection)} for object detection")
+                results = await ObjectDetector.detect_objects_in_image(image_filepath, img_url, vision_batch[j] or {})
+            # Results missing a failed Vision lookup aren't cached, so the image is retried next run
+            if results and cache_keys[j] and (vision_batch[j] or not vision_enabled):
+                detection_cache.put(cache_keys[j], results)
+            return results
+        
+        all_results = await asyncio.gather(*(detect(j) for j in range(len(targets))), return_exceptions=True)
+        
+        # Merge in image order
+        for (i, _, _), results in zip(targets, all_results):
+            if isinstance(results, BaseException):
+                logger.error(f"Error processing image {i+1} for object detection: {results}")
+                logger.error(f"Traceback: {''.join(traceback.format_exception(results))}")
+            elif results:
+                detection_results['detected_objects'].extend(results.get('objects', []))
+                detection_results['detected_brands'].extend(results.get('brands', []))
+                detection_results['model_numbers'].extend(results.get('model_info', []))
+                detection_results['colors'].extend(results.get('colors', []))
+                detection_results['additional_text'].extend(results.get('text', []))
+                
+                logger.info(f"Detection results for image {i+1}: " + 
+                            f"{len(results.get('objects', []))} objects, " +
+                            f"{len(results.get('brands', []))} brands")
+            else:
+                logger.warning(f"No detection results for image {i+1}")
+        
+        # Remove duplicates, keeping image order and each image's ranking, so the
+        # top objects and colors picked for the search query are the strongest ones
         for key in detection_results:
-            detection_results[key] = list(set(detection_results[key]))
+            detection_results[key] = list(dict.fromkeys(detection_results[key]))
         
         # Add detection results to item
         item['object_detection'] = detection_results
@@ -21,6 +21,25 @@ from scraper.llm_query_generator import LLMQueryGenerator
 # Set up logger
 logger = setup_logger("PriceFinder")
 
+# Common price patterns, compiled once and shared by every search
+PRICE_PATTERNS = [re.compile(pattern) for pattern in [
+    r'\$\s?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)',  # $123,456.78
+    r'(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # 123,456.78 USD
+    r'Price[:;]\s*\$?(\d+(?:\.\d{1,2})?)',  # Price: $123.45 or Price: 123.45
+    r'(\d+(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # Simple price like 123.45 USD
+]]
+
+# Text cleanup patterns
+NON_PRICE_CHARS = re.compile(r'[^\d.]')
+LOT_NUMBER_PREFIX = re.compile(r'Lot #.*?:')
+OAD_LOT_NUMBER = re.compile(r'OAD\d+')
+NON_QUERY_CHARS = re.compile(r'[^a-zA-Z0-9\s]')
+WHITESPACE = re.compile(r'\s+')
+
+# Description hints used by the price estimate
+MULTI_PIECE = re.compile(r'set of \d+|\d+ piece')
+SIZE_INCHES = re.compile(r'(\d+)(?:"|inch|in)')
+
 class PriceFinder:
     """Find market prices for auction items using various sources"""
     
@@ -45,7 +64,7 @@ class PriceFinder:
             return 0.0
                 
         # Remove currency symbols and other non-numeric characters
-        clean_str = re.sub(r'[^\d.]', '', price_str)
+        clean_str = NON_PRICE_CHARS.sub('', price_str)
             
         try:
             return float(clean_str)
@@ -93,20 +112,12 @@ class PriceFinder:
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # Look for price patterns in the page
-            # Common price patterns
-            price_patterns = [
-                r'\$\s?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)',  # $123,456.78
-                r'(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # 123,456.78 USD
-                r'Price[:;]\s*\$?(\d+(?:\.\d{1,2})?)',  # Price: $123.45 or Price: 123.45
-                r'(\d+(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # Simple price like 123.45 USD
-            ]
-            
             prices = []
             page_text = soup.get_text()
             
             # Extract all prices from the page
-            for pattern in price_patterns:
-                matches = re.findall(pattern, page_text)
+            for pattern in PRICE_PATTERNS:
+                matches = pattern.findall(page_text)
                 for match in matches:
                     # If match is a tuple (from regex groups), use the first item
                     if isinstance(match, tuple) and match:
@@ -143,12 +154,12 @@ class PriceFinder:
             clean_query = query
             
             # Remove lot numbers from query
-            clean_query = re.sub(r'Lot #.*?:', '', clean_query)
-            clean_query = re.sub(r'OAD\d+', '', clean_query)  # Remove specific lot number formats
+            clean_query = LOT_NUMBER_PREFIX.sub('', clean_query)
+            clean_query = OAD_LOT_NUMBER.sub('', clean_query)  # Remove specific lot number formats
             
             # Filter to only allow alphanumeric characters for the search query
-            clean_query = re.sub(r'[^a-zA-Z0-9\s]', ' ', clean_query)
-            clean_query = re.sub(r'\s+', ' ', clean_query).strip()
+            clean_query = NON_QUERY_CHARS.sub(' ', clean_query)
+            clean_query = WHITESPACE.sub(' ', clean_query).strip()
             
             # Limit query length to avoid overly specific searches
             if len(clean_query) > 100:
@@ -214,16 +225,9 @@ class PriceFinder:
                 logger.debug(f"Search result: {title} - {snippet[:100]}")
                 
                 # Look for price patterns in title and snippet
-                price_patterns = [
-                    r'\$\s?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)',  # $123,456.78
-                    r'(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # 123,456.78 USD
-                    r'Price[:;]\s*\$?(\d+(?:\.\d{1,2})?)',  # Price: $123.45 or Price: 123.45
-                    r'(\d+(?:\.\d{1,2})?)(?:\s?USD|\s?dollars|\s?\$)',  # Simple price like 123.45 USD
-                ]
-                
-                for pattern in price_patterns:
+                for pattern in PRICE_PATTERNS:
                     for text in [title, snippet]:
-                        matches = re.findall(pattern, text)
+                        matches = pattern.findall(text)
                         for match in matches:
                             # If match is a tuple (from regex groups), use the first item
                             if isinstance(match, tuple) and match:
@@ -261,12 +265,12 @@ class PriceFinder:
             clean_query = query
             
             # Remove lot numbers from query
-            clean_query = re.sub(r'Lot #.*?:', '', clean_query)
-            clean_query = re.sub(r'OAD\d+', '', clean_query)  # Remove specific lot number formats
+            clean_query = LOT_NUMBER_PREFIX.sub('', clean_query)
+            clean_query = OAD_LOT_NUMBER.sub('', clean_query)  # Remove specific lot number formats
             
             # Remove non-English characters - only keep a-z, A-Z, 0-9, and spaces
-            clean_query = re.sub(r'[^a-zA-Z0-9\s]', ' ', clean_query)
-            clean_query = re.sub(r'\s+', ' ', clean_query).strip()
+            clean_query = NON_QUERY_CHARS.sub(' ', clean_query)
+            clean_query = WHITESPACE.sub(' ', clean_query).strip()
             
             # Limit query length for better search results
             if len(clean_query) > 100:
@@ -407,12 +411,12 @@ class PriceFinder:
                     logger.debug(f"Subtracted low-value keyword penalty for: {keyword}")
             
             # Size/quantity adjustments
-            if re.search(r'set of \d+', lower_desc) or re.search(r'\d+ piece', lower_desc):
+            if MULTI_PIECE.search(lower_desc):
                 base_price *= 1.5
                 logger.debug("Added multi-piece bonus")
             
             # Number modifiers
-            number_match = re.search(r'(\d+)(?:"|inch|in)', lower_desc)
+            number_match = SIZE_INCHES.search(lower_desc)
             if number_match:
                 # Adjust price based on size (e.g., TV inches)
                 size = int(number_match.group(1))
@@ -430,8 +434,8 @@ class PriceFinder:
             logger.error(f"Error estimating price from description: {e}")
             return 25.0  # Default fallback price
     
-    async def get_best_market_price(self, item):
-        """Get the best market price from multiple sources"""
+    async def get_best_market_price(self, item, llm_results=None):
+        """Get the best market price from multiple sources, reusing LLM query results generated ahead of time"""
         try:
             search_query = None
             amazon_query = None
@@ -441,7 +445,8 @@ class PriceFinder:
             if OPENROUTER_ENABLED:
                 logger.info(f"Trying LLM-based search query generation for item: {item.get('lotNumber', 'Unknown')}")
                 try:
-                    llm_results = await LLMQueryGenerator.generate_search_query(item)
+                    if llm_results is None:
+                        llm_results = await LLMQueryGenerator.generate_search_query(item)
                     
                     if llm_results and "error" not in llm_results:
                         # Store the identified product information
@@ -538,7 +543,8 @@ class PriceFinder:
             return 25.0  # Default fallback price
     
     async def close(self):
-        """Close the search session"""
+        """Close the search session and the LLM query generator's session"""
         if self.search_session:
             await self.search_session.close()
-            self.search_session = None
\ No newline at end of file
+            self.search_session = None
+        await LLMQueryGenerator.close()
\ No newline at end of file
@@ -14,10 +14,97 @@ from urllib.parse import quote_plus
 
 from config import GOOGLE_API_KEY, PRODUCT_SEARCH_ENABLED
 from utils.logger import setup_logger
+from utils.brands import COMMON_BRANDS, find_brands
 
 # Set up logger
 logger = setup_logger("ProductIdentifier")
 
+# Model number patterns, tried in order; compiled once instead of on every item
+MODEL_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Common labeled patterns
+    r'\bmodel[:\s]+([a-z0-9\-]{3,15})\b',    # Model: ABC123
+    r'\bpart[:\s#]+([a-z0-9\-]{3,15})\b',    # Part#: ABC123
+    r'\bsku[:\s]+([a-z0-9\-]{4,15})\b',      # SKU: ABC123
+
+    # Standard model number patterns
+    r'\b[A-Za-z]{1,4}-\d{2,6}\b',            # ABC-123
+    r'\b[A-Za-z]{2,4}\d{2,4}[A-Za-z]?\b',    # TX550, RTX3080
+    r'\b[A-Z]{2,8}\d{4,8}\b',                # SKGJ5678 (SKU-like)
+    r'\b\d{1,4}[A-Za-z]{1,3}\d{1,4}\b',      # 55UH6150
+
+    # Brand-specific patterns
+    r'\biphone\s*\d{1,2}(?:\s*pro)?\b',       # iPhone 12 Pro
+    r'\bgalaxy\s*s\d{1,2}(?:\s*plus)?\b',     # Galaxy S21 Plus
+    r'\bmacbook\s*(?:pro|air)?\s*\d{1,2}(?:\s*inch)?\b',  # MacBook Pro 13 inch
+    r'\bps\d\b',                              # PS5
+    r'\bxbox\s*(?:one|series\s*[xs])\b',      # Xbox Series X
+    r'\bv\d{1,2}\b',                          # V10 (like Dyson)
+
+    # Common prefixed formats with numbers
+    r'\b([a-z]{1,3}\d{3,5}[a-z]{0,2})\b',     # WD5000, LG1500B
+]]
+
+# Keywords that suggest each product category
+CATEGORY_KEYWORDS = {
+    'television': ['tv', 'television', 'smart tv', 'hdtv', '4k', '8k', 'oled', 'qled', 'lcd'],
+    'smartphone': ['phone', 'smartphone', 'iphone', 'galaxy', 'android', 'mobile'],
+    'laptop': ['laptop', 'notebook', 'macbook', 'chromebook', 'ultrabook'],
+    'tablet': ['tablet', 'ipad', 'galaxy tab', 'surface'],
+    'camera': ['camera', 'dslr', 'mirrorless', 'digital camera', 'gopro'],
+    'speaker': ['speaker', 'bluetooth speaker', 'sound bar', 'soundbar', 'surround sound'],
+    'headphones': ['headphones', 'earbuds', 'earphones', 'headset', 'airpods'],
+    'watch': ['watch', 'smartwatch', 'fitness tracker', 'apple watch', 'garmin'],
+    'gaming': ['xbox', 'playstation', 'nintendo', 'ps5', 'ps4', 'switch', 'gaming console'],
+    'appliance': ['refrigerator', 'fridge', 'washer', 'dryer', 'dishwasher', 'microwave', 'oven', 'stove'],
+    'vacuum': ['vacuum', 'robot vacuum', 'stick vacuum', 'dyson'],
+    'tool': ['drill', 'saw', 'screwdriver', 'tool set', 'power tool', 'cordless tool'],
+    'furniture': ['chair', 'table', 'sofa', 'bed', 'dresser', 'desk', 'bookshelf'],
+    'jewelry': ['ring', 'necklace', 'bracelet', 'earrings', 'gold', 'silver', 'diamond'],
+    'clothing': ['shirt', 'pants', 'jacket', 'dress', 'shoes', 'boots', 'sneakers'],
+    'toy': ['toy', 'lego', 'puzzle', 'action figure', 'doll', 'barbie', 'nerf']
+}
+CATEGORY_KEYWORD_PATTERNS = {
+    category: [re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) for keyword in keywords]
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
+# Specification patterns
+DIMENSION_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*(?:in|inch|inches|cm)?',  # 10 x 20 x 30 in
+    r'(\d+(?:\.\d+)?)\s*(?:in|inch|inches|cm)\s*(?:diagonal|screen)',  # 55 inch diagonal
+]]
+STORAGE_PATTERN = re.compile(r'(\d+)\s*(?:gb|tb|gigabyte|terabyte)', re.IGNORECASE)
+WEIGHT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:lb|pound|kg|kilogram|g|gram)', re.IGNORECASE)
+POWER_PATTERN = re.compile(r'(\d+)\s*(?:v|volt|w|watt)', re.IGNORECASE)
+
+# Brands and model/serial patterns that mark an original description as already specific
+DESCRIPTION_BRANDS = [
+    'samsung', 'sony', 'apple', 'lg', 'bosch', 'dewalt', 'milwaukee', 
+    'makita', 'craftsman', 'ryobi', 'stanley', 'black and decker', 'black & decker',
+    'kitchenaid', 'whirlpool', 'ge', 'general electric', 'maytag', 'kenmore',
+    'frigidaire', 'philips', 'panasonic', 'toshiba', 'sharp', 'dell', 'hp',
+    'microsoft', 'lenovo', 'asus', 'acer', 'canon', 'nikon', 'gopro',
+    'bose', 'sennheiser', 'jbl', 'sonos', 'klipsch', 'polk', 'pioneer',
+    'yamaha', 'denon', 'vizio', 'insignia', 'nintendo', 'playstation', 'xbox',
+    'dyson', 'shark', 'hoover', 'eureka', 'bissell', 'miele', 'roomba', 'irobot',
+    'nutribullet', 'cuisinart', 'ninja', 'breville', 'calphalon',
+    'coleman', 'weber', 'traeger', 'yeti', 'north face', 'patagonia', 'columbia',
+    'nike', 'adidas', 'under armour', 'new balance', 'puma', 'reebok'
+]
+DESCRIPTION_MODEL_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'\b[A-Za-z]{1,4}-\d{2,6}\b',            # ABC-123
+    r'\b[A-Za-z]{2,4}\d{2,4}[A-Za-z]?\b',    # TX550, RTX3080
+    r'\b[A-Z]{2,8}\d{4,8}\b',                # SKGJ5678 (SKU-like)
+    r'\bmodel[:\s]+([a-z0-9\-]{3,15})\b',    # Model: ABC123
+    r'\bpart[:\s#]+([a-z0-9\-]{3,15})\b',    # Part#: ABC123
+    r'\b(?:serial|s/n)[:\s#]+([a-z0-9\-]{3,15})\b',    # Serial: ABC123
+    r'\b(?:model|mod|mdl)[:\s#]+([a-z0-9\-]{3,15})\b', # Mod: ABC123
+]]
+
+# Text cleanup patterns
+LOT_NUMBER_PREFIX = re.compile(r'Lot #.*?:')
+WHITESPACE = re.compile(r'\s+')
+
 class ProductIdentifier:
     """
     Identifies products using various APIs and techniques to provide
@@ -289,61 +376,18 @@ class ProductIdentifier:
             
             # Expanded brand list (if we don't already have a brand)
             if not result['brand']:
-                known_brands = [
-                    'samsung', 'sony', 'apple', 'lg', 'bosch', 'dewalt', 'milwaukee',
-                    'makita', 'craftsman', 'ryobi', 'stanley', 'black and decker', 'black & decker',
-                    'kitchenaid', 'whirlpool', 'ge', 'general electric', 'maytag', 'kenmore',
-                    'frigidaire', 'philips', 'panasonic', 'toshiba', 'sharp', 'dell', 'hp',
-                    'microsoft', 'lenovo', 'asus', 'acer', 'canon', 'nikon', 'sony', 'gopro',
-                    'bose', 'sennheiser', 'jbl', 'sonos', 'klipsch', 'polk', 'pioneer',
-                    'yamaha', 'denon', 'vizio', 'insignia', 'nintendo', 'playstation', 'xbox',
-                    'dyson', 'shark', 'hoover', 'eureka', 'bissell', 'miele', 'roomba', 'irobot',
-                    'nutribullet', 'kitchenaid', 'cuisinart', 'ninja', 'breville', 'calphalon',
-                    'coleman', 'weber', 'traeger', 'yeti', 'north face', 'patagonia', 'columbia',
-                    'nike', 'adidas', 'under armour', 'new balance', 'puma', 'reebok',
-                    'levi\'s', 'gap', 'calvin klein', 'ralph lauren', 'gucci', 'coach',
-                    'rolex', 'casio', 'citizen', 'seiko', 'timex', 'fossil', 'omega',
-                    'lego', 'mattel', 'hasbro', 'fisher price', 'barbie', 'nerf',
-                    'ikea', 'ashley', 'la-z-boy', 'ethan allen', 'thomasville', 'bassett'
-                ]
-                
-                for brand in known_brands:
-                    # Check for brand with word boundaries to avoid false matches
-                    pattern = r'\b' + re.escape(brand) + r'\b'
-                    if re.search(pattern, all_text, re.IGNORECASE):
+                # One scan finds every whole-word brand; the first in list order wins
+                found_brands = find_brands(all_text)
+                for brand in COMMON_BRANDS:
+                    if brand in found_brands:
                         result['brand'] = brand.title()
                         logger.info(f"Extracted brand from text: {result['brand']}")
                         break
             
             # Extract model numbers if we don't already have one
             if not result['model']:
-                # Extended model patterns for more coverage
-                model_patterns = [
-                    # Common labeled patterns
-                    r'\bmodel[:\s]+([a-z0-9\-]{3,15})\b',    # Model: ABC123
-                    r'\bpart[:\s#]+([a-z0-9\-]{3,15})\b',    # Part#: ABC123
-                    r'\bsku[:\s]+([a-z0-9\-]{4,15})\b',      # SKU: ABC123
-                    
-                    # Standard model number patterns
-                    r'\b[A-Za-z]{1,4}-\d{2,6}\b',            # ABC-123
-                    r'\b[A-Za-z]{2,4}\d{2,4}[A-Za-z]?\b',    # TX550, RTX3080
-                    r'\b[A-Z]{2,8}\d{4,8}\b',                # SKGJ5678 (SKU-like)
-                    r'\b\d{1,4}[A-Za-z]{1,3}\d{1,4}\b',      # 55UH6150
-                    
-                    # Brand-specific patterns
-                    r'\biphone\s*\d{1,2}(?:\s*pro)?\b',       # iPhone 12 Pro
-                    r'\bgalaxy\s*s\d{1,2}(?:\s*plus)?\b',     # Galaxy S21 Plus
-                    r'\bmacbook\s*(?:pro|air)?\s*\d{1,2}(?:\s*inch)?\b',  # MacBook Pro 13 inch
-                    r'\bps\d\b',                              # PS5
-                    r'\bxbox\s*(?:one|series\s*[xs])\b',      # Xbox Series X
-                    r'\bv\d{1,2}\b',                          # V10 (like Dyson)
-                    
-                    # Common prefixed formats with numbers
-                    r'\b([a-z]{1,3}\d{3,5}[a-z]{0,2})\b',     # WD5000, LG1500B
-                ]
-                
-                for pattern in model_patterns:
-                    matches = re.findall(pattern, all_text, re.IGNORECASE)
+                for pattern in MODEL_PATTERNS:
+                    matches = pattern.findall(all_text)
                     if matches:
                         # If the pattern has a capture group, use that
                         if isinstance(matches[0], tuple):
@@ -357,31 +401,11 @@ class ProductIdentifier:
                             logger.info(f"Extracted model from text: {result['model']}")
                             break
             
-            # Try to determine product category from keywords
-            category_keywords = {
-                'television': ['tv', 'television', 'smart tv', 'hdtv', '4k', '8k', 'oled', 'qled', 'lcd'],
-                'smartphone': ['phone', 'smartphone', 'iphone', 'galaxy', 'android', 'mobile'],
-                'laptop': ['laptop', 'notebook', 'macbook', 'chromebook', 'ultrabook'],
-                'tablet': ['tablet', 'ipad', 'galaxy tab', 'surface'],
-                'camera': ['camera', 'dslr', 'mirrorless', 'digital camera', 'gopro'],
-                'speaker': ['speaker', 'bluetooth speaker', 'sound bar', 'soundbar', 'surround sound'],
-                'headphones': ['headphones', 'earbuds', 'earphones', 'headset', 'airpods'],
-                'watch': ['watch', 'smartwatch', 'fitness tracker', 'apple watch', 'garmin'],
-                'gaming': ['xbox', 'playstation', 'nintendo', 'ps5', 'ps4', 'switch', 'gaming console'],
-                'appliance': ['refrigerator', 'fridge', 'washer', 'dryer', 'dishwasher', 'microwave', 'oven', 'stove'],
-                'vacuum': ['vacuum', 'robot vacuum', 'stick vacuum', 'dyson'],
-                'tool': ['drill', 'saw', 'screwdriver', 'tool set', 'power tool', 'cordless tool'],
-                'furniture': ['chair', 'table', 'sofa', 'bed', 'dresser', 'desk', 'bookshelf'],
-                'jewelry': ['ring', 'necklace', 'bracelet', 'earrings', 'gold', 'silver', 'diamond'],
-                'clothing': ['shirt', 'pants', 'jacket', 'dress', 'shoes', 'boots', 'sneakers'],
-                'toy': ['toy', 'lego', 'puzzle', 'action figure', 'doll', 'barbie', 'nerf']
-            }
-            
             # Find the category with the most keyword matches
-            category_matches = {cat: 0 for cat in category_keywords}
-            for category, keywords in category_keywords.items():
-                for keyword in keywords:
-                    if re.search(r'\b' + re.escape(keyword) + r'\b', all_text, re.IGNORECASE):
+            category_matches = {cat: 0 for cat in CATEGORY_KEYWORD_PATTERNS}
+            for category, patterns in CATEGORY_KEYWORD_PATTERNS.items():
+                for pattern in patterns:
+                    if pattern.search(all_text):
                         category_matches[category] += 1
             
             # Find the category with most matches
@@ -393,13 +417,8 @@ class ProductIdentifier:
             
             # Extract specifications
             # Dimensions
-            dimension_patterns = [
-                r'(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*x\s*(\d+(?:\.\d+)?)\s*(?:in|inch|inches|cm)?',  # 10 x 20 x 30 in
-                r'(\d+(?:\.\d+)?)\s*(?:in|inch|inches|cm)\s*(?:diagonal|screen)',  # 55 inch diagonal
-            ]
-            
-            for pattern in dimension_patterns:
-                matches = re.findall(pattern, all_text)
+            for pattern in DIMENSION_PATTERNS:
+                matches = pattern.findall(all_text)
                 if matches:
                     # Store dimensions in specifications
                     if isinstance(matches[0], tuple) and len(matches[0]) == 3:
@@ -409,20 +428,17 @@ class ProductIdentifier:
                     break
             
             # Storage capacity
-            storage_pattern = r'(\d+)\s*(?:gb|tb|gigabyte|terabyte)'
-            storage_matches = re.findall(storage_pattern, all_text, re.IGNORECASE)
+            storage_matches = STORAGE_PATTERN.findall(all_text)
             if storage_matches:
                 result['specifications']['storage'] = f"{storage_matches[0]} GB"
             
             # Weight
-            weight_pattern = r'(\d+(?:\.\d+)?)\s*(?:lb|pound|kg|kilogram|g|gram)'
-            weight_matches = re.findall(weight_pattern, all_text, re.IGNORECASE)
+            weight_matches = WEIGHT_PATTERN.findall(all_text)
             if weight_matches:
                 result['specifications']['weight'] = weight_matches[0]
             
             # Power/voltage
-            power_pattern = r'(\d+)\s*(?:v|volt|w|watt)'
-            power_matches = re.findall(power_pattern, all_text, re.IGNORECASE)
+            power_matches = POWER_PATTERN.findall(all_text)
             if power_matches:
                 result['specifications']['power'] = f"{power_matches[0]}V/W"
             
@@ -442,7 +458,7 @@ class ProductIdentifier:
             original_description = item.get('description', '')
             # Clean up the original description
             if original_description and 'Lot #' in original_description:
-                original_description = re.sub(r'Lot #.*?:', '', original_description).strip()
+                original_description = LOT_NUMBER_PREFIX.sub('', original_description).strip()
             
             # Start with the original item description as the base
             if not original_description:
@@ -523,22 +539,9 @@ class ProductIdentifier:
             brand_in_description = None
             
             # First, check against our common brands list
-            common_brands = [
-                'samsung', 'sony', 'apple', 'lg', 'bosch', 'dewalt', 'milwaukee', 
-                'makita', 'craftsman', 'ryobi', 'stanley', 'black and decker', 'black & decker',
-                'kitchenaid', 'whirlpool', 'ge', 'general electric', 'maytag', 'kenmore',
-                'frigidaire', 'philips', 'panasonic', 'toshiba', 'sharp', 'dell', 'hp',
-                'microsoft', 'lenovo', 'asus', 'acer', 'canon', 'nikon', 'gopro',
-                'bose', 'sennheiser', 'jbl', 'sonos', 'klipsch', 'polk', 'pioneer',
-                'yamaha', 'denon', 'vizio', 'insignia', 'nintendo', 'playstation', 'xbox',
-                'dyson', 'shark', 'hoover', 'eureka', 'bissell', 'miele', 'roomba', 'irobot',
-                'nutribullet', 'cuisinart', 'ninja', 'breville', 'calphalon',
-                'coleman', 'weber', 'traeger', 'yeti', 'north face', 'patagonia', 'columbia',
-                'nike', 'adidas', 'under armour', 'new balance', 'puma', 'reebok'
-            ]
-            
-            for brand in common_brands:
-                if re.search(r'\b' + re.escape(brand) + r'\b', base_desc_lower):
+            found_brands = find_brands(base_desc_lower)
+            for brand in DESCRIPTION_BRANDS:
+                if brand in found_brands:
                     has_brand_in_description = True
                     brand_in_description = brand
                     logger.info(f"Found brand name in original description: {brand}")
@@ -548,16 +551,8 @@ class ProductIdentifier:
             # If so, we'll prioritize the original description even more
             has_model_in_description = False
             model_in_description = None
-            for pattern in [
-                r'\b[A-Za-z]{1,4}-\d{2,6}\b',            # ABC-123
-                r'\b[A-Za-z]{2,4}\d{2,4}[A-Za-z]?\b',    # TX550, RTX3080
-                r'\b[A-Z]{2,8}\d{4,8}\b',                # SKGJ5678 (SKU-like)
-                r'\bmodel[:\s]+([a-z0-9\-]{3,15})\b',    # Model: ABC123
-                r'\bpart[:\s#]+([a-z0-9\-]{3,15})\b',    # Part#: ABC123
-                r'\b(?:serial|s/n)[:\s#]+([a-z0-9\-]{3,15})\b',    # Serial: ABC123
-                r'\b(?:model|mod|mdl)[:\s#]+([a-z0-9\-]{3,15})\b', # Mod: ABC123
-            ]:
-                match = re.search(pattern, base_description, re.IGNORECASE)
+            for pattern in DESCRIPTION_MODEL_PATTERNS:
+                match = pattern.search(base_description)
                 if match:
                     has_model_in_description = True
                     model_in_description = match.group(0)
@@ -606,7 +601,7 @@ class ProductIdentifier:
                 final_query += f" {product_info['category']}"
             
             # Clean up the query
-            final_query = re.sub(r'\s+', ' ', final_query).strip()
+            final_query = WHITESPACE.sub(' ', final_query).strip()
             
             # Limit query length
             if len(final_query) > 150:
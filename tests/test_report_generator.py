@@ -0,0 +1,82 @@
+"""
+Tests for the Excel report writers
+"""
+
+from urllib.parse import quote_plus
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+from openpyxl.utils import get_column_letter
+
+from analyzer.report_generator import ReportGenerator
+
+QUERY = "AT&T phone #5 C++ 50%"
+
+ITEMS = [
+    {
+        'lotNumber': 'Lot #1', 'description': 'Phone', 'used_search_query': QUERY,
+        'current_bid_float': 10, 'market_price': 30, 'itemUrl': 'https://example.com/1',
+        'images': ['https://example.com/1.jpg', 'https://example.com/2.jpg']
+    },
+    {
+        'lotNumber': 'Lot #2', 'description': 'Thing', 'used_search_query': 'plain',
+        'current_bid_float': 5, 'market_price': 4, 'itemUrl': 'https://example.com/2',
+        'images': []
+    }
+]
+
+def _fast_excel_writer():
+    pytest.importorskip("rustpy_xlsxwriter")
+    return ReportGenerator._write_fast_excel
+
+WRITERS = {
+    'openpyxl': lambda: ReportGenerator._write_openpyxl_report,
+    'fast_excel': _fast_excel_writer
+}
+
+@pytest.fixture(params=list(WRITERS))
+def report(request, tmp_path):
+    """Write the sample items with each writer and return (data frame, opened workbook)"""
+    writer = WRITERS[request.param]()
+    df, metadata = ReportGenerator._build_report_frames(ITEMS)
+    output_path = str(tmp_path / "report.xlsx")
+    writer(output_path, df, metadata)
+    return df, openpyxl.load_workbook(output_path)
+
+def _column_widths(worksheet):
+    """Column letter -> width, expanding the min..max ranges writers may group columns into"""
+    widths = {}
+    for dimension in worksheet.column_dimensions.values():
+        if dimension.min is None:
+            continue
+        for col_num in range(dimension.min, dimension.max + 1):
+            widths[get_column_letter(col_num)] = dimension.width
+    return widths
+
+def test_search_links_are_url_encoded(report):
+    df, workbook = report
+    worksheet = workbook['Opportunities']
+    header = [cell.value for cell in worksheet[1]]
+    row = next(index for index, cell in enumerate(worksheet['A'], start=1) if cell.value == 'Lot #1')
+    expected = {
+        'Google Search': f"https://www.google.com/search?q={quote_plus(QUERY)}",
+        'Amazon Search': f"https://www.amazon.com/s?k={quote_plus(QUERY)}"
+    }
+    for column, url in expected.items():
+        cell = worksheet.cell(row, header.index(column) + 1)
+        assert cell.hyperlink is not None
+        assert cell.hyperlink.target == url
+
+def test_metadata_counts_are_integers(report):
+    _, workbook = report
+    values = {row[0].value: row[1].value for row in workbook['Metadata'].iter_rows(min_row=2)}
+    assert str(values['Total Items']) == '2'
+    assert str(values['Items Skipped']) == '0'
+
+def test_every_column_gets_its_width(report):
+    df, workbook = report
+    widths = _column_widths(workbook['Opportunities'])
+    expected = ReportGenerator._column_widths(df)
+    for col_num, column in enumerate(df.columns, start=1):
+        assert widths.get(get_column_letter(col_num)) == pytest.approx(expected[column], abs=1), column
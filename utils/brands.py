@@ -0,0 +1,65 @@
+"""
+Brand name matching shared by OCR and product identification
+"""
+
+import re
+
+try:
+    # Aho-Corasick automaton; finds every brand in one pass over the text
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Common brand names to look for
+COMMON_BRANDS = [
+    'samsung', 'sony', 'apple', 'lg', 'bosch', 'dewalt', 'milwaukee', 
+    'makita', 'craftsman', 'ryobi', 'stanley', 'black and decker', 'black & decker',
+    'kitchenaid', 'whirlpool', 'ge', 'general electric', 'maytag', 'kenmore',
+    'frigidaire', 'philips', 'panasonic', 'toshiba', 'sharp', 'dell', 'hp',
+    'microsoft', 'lenovo', 'asus', 'acer', 'canon', 'nikon', 'sony', 'gopro',
+    'bose', 'sennheiser', 'jbl', 'sonos', 'klipsch', 'polk', 'pioneer',
+    'yamaha', 'denon', 'vizio', 'insignia', 'nintendo', 'playstation', 'xbox',
+    'dyson', 'shark', 'hoover', 'eureka', 'bissell', 'miele', 'roomba', 'irobot',
+    'nutribullet', 'kitchenaid', 'cuisinart', 'ninja', 'breville', 'calphalon',
+    'coleman', 'weber', 'traeger', 'yeti', 'north face', 'patagonia', 'columbia',
+    'nike', 'adidas', 'under armour', 'new balance', 'puma', 'reebok',
+    'levi\'s', 'gap', 'calvin klein', 'ralph lauren', 'gucci', 'coach',
+    'rolex', 'casio', 'citizen', 'seiko', 'timex', 'fossil', 'omega',
+    'lego', 'mattel', 'hasbro', 'fisher price', 'barbie', 'nerf',
+    'ikea', 'ashley', 'la-z-boy', 'ethan allen', 'thomasville', 'bassett'
+]
+
+# Single-word brands are found by intersecting the text's words with this set,
+# without running a regex at all
+WORD = re.compile(r'\w+')
+SINGLE_WORD_BRANDS = frozenset(brand for brand in COMMON_BRANDS if WORD.fullmatch(brand))
+
+# The remaining brands (spaces, '&', apostrophes, hyphens) folded into one
+# alternation, longest first so the longer name wins
+MULTI_WORD_BRANDS = sorted(set(COMMON_BRANDS) - SINGLE_WORD_BRANDS, key=len, reverse=True)
+BRAND_PATTERN = re.compile(r'\b(' + '|'.join(re.escape(brand) for brand in MULTI_WORD_BRANDS) + r')\b')
+
+# With pyahocorasick installed, multi-word brands are matched by an automaton instead
+BRAND_AUTOMATON = None
+if ahocorasick is not None:
+    BRAND_AUTOMATON = ahocorasick.Automaton()
+    for brand in MULTI_WORD_BRANDS:
+        BRAND_AUTOMATON.add_word(brand, brand)
+    BRAND_AUTOMATON.make_automaton()
+
+def find_brands(text):
+    """Return the set of brands appearing as whole words in lowercased text"""
+    brands = set(WORD.findall(text)) & SINGLE_WORD_BRANDS
+    
+    if BRAND_AUTOMATON is None:
+        brands.update(BRAND_PATTERN.findall(text))
+        return brands
+    
+    for end, brand in BRAND_AUTOMATON.iter(text):
+        start = end - len(brand) + 1
+        # Keep whole-word matches only, like the \b boundaries of BRAND_PATTERN
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end + 1] if end + 1 < len(text) else ' '
+        if not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_'):
+            brands.add(brand)
+    return brands
@@ -5,7 +5,8 @@ File utilities for the Auction Bot
 import os
 import json
 import time
-from config import PROGRESS_DIR, HTML_DIR, IMAGES_DIR
+import hashlib
+from config import PROGRESS_DIR, HTML_DIR, IMAGES_DIR, DEBUG_DUMP_HTML
 
 def save_json(data, filename, directory=PROGRESS_DIR):
     """Save data to a JSON file in the specified directory"""
@@ -28,8 +29,22 @@ def load_json(filename, directory=PROGRESS_DIR):
         print(f"Error loading JSON file {filepath}: {e}")
         return None
 
+def append_jsonl(data, filename, directory=PROGRESS_DIR):
+    """Append one record as a single JSON line to a file in the specified directory"""
+    try:
+        filepath = os.path.join(directory, filename)
+        with open(filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(data, separators=(',', ':')) + '\n')
+        return filepath
+    except Exception as e:
+        print(f"Error appending to JSONL file {filepath}: {e}")
+        return None
+
 def save_html(html_content, prefix="page", directory=HTML_DIR):
-    """Save HTML content to a file with timestamp"""
+    """Save HTML content to a file with timestamp, when DEBUG_DUMP_HTML is enabled"""
+    if not DEBUG_DUMP_HTML:
+        return None
+    
     try:
         timestamp = int(time.time())
         filename = f"{prefix}_{timestamp}.html"
@@ -46,3 +61,15 @@ def generate_image_filepath(lot_id, image_number, suffix="", directory=IMAGES_DI
     """Generate a filepath for an image based on lot ID and image number"""
     filename = f"item_{lot_id}_image_{image_number}{suffix}.jpg"
     return os.path.join(directory, filename)
+
+def item_file_id(item):
+    """Build a filesystem-safe ID for an item's files from its lot number, or its URL if there is none"""
+    lot_id = item.get('lotNumber', '').replace(' ', '_').replace('#', '').replace(':', '')
+    if lot_id:
+        return lot_id
+    # Items without a lot number are still unique by URL, unlike a timestamp
+    # that the parallel item workers can share within the same second
+    item_url = item.get('itemUrl', '')
+    if item_url:
+        return f"unknown_{hashlib.md5(item_url.encode('utf-8')).hexdigest()[:12]}"
+    return f"unknown_{id(item)}"
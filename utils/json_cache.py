@@ -0,0 +1,66 @@
+"""
+Size-capped key/value cache persisted as a JSON file, shared by the OCR and LLM caches
+"""
+
+import os
+import json
+import atexit
+
+class JsonCache:
+    """In-memory dict loaded from a JSON file on first use and written back by flush()"""
+    
+    def __init__(self, path, version, max_entries):
+        self.path = path
+        self.version = version  # Entries saved under another version are discarded on load
+        self.max_entries = max_entries  # Oldest entries are dropped past this
+        self._entries = None
+        self._unsaved = 0
+        # Save whatever is left if the process exits before the run flushes
+        atexit.register(self.flush)
+    
+    def _load(self):
+        """Load the cache file on first use"""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.version:
+                    # Entries are saved oldest first, so a cap lowered since the last run keeps the newest
+                    entries = data.get('entries', {})
+                    if len(entries) > self.max_entries:
+                        entries = dict(list(entries.items())[-self.max_entries:])
+                    self._entries = entries
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error loading cache {self.path}: {e}")
+        return self._entries
+    
+    def get(self, key):
+        """Return the cached value for a key, or None on a miss"""
+        return self._load().get(key)
+    
+    def put(self, key, value):
+        """Store the value for a key in memory; it reaches disk on the next flush()"""
+        entries = self._load()
+        # Re-inserting moves the key to the newest end, so eviction drops the oldest entries
+        entries.pop(key, None)
+        entries[key] = value
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+        self._unsaved += 1
+    
+    def flush(self):
+        """Write any unsaved cache entries to disk, once the run is done with the cache"""
+        if self._entries is None or not self._unsaved:
+            return
+        try:
+            # Write a temporary file and swap it in, so an interrupted save keeps the old cache
+            temp_file = self.path + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'entries': self._entries}, f)
+            os.replace(temp_file, self.path)
+            self._unsaved = 0
+        except Exception as e:
+            print(f"Error saving cache {self.path}: {e}")
@@ -0,0 +1,34 @@
+"""
+Persistent cache of OCR results for the Auction Bot
+"""
+
+import os
+import hashlib
+from config import DATA_DIR
+from utils.json_cache import JsonCache
+
+OCR_CACHE_FILE = os.path.join(DATA_DIR, "ocr_cache.json")
+OCR_CACHE_VERSION = 3  # Bump when image preprocessing changes so stale text is discarded
+MAX_ENTRIES = 20000  # Oldest entries are dropped past this, so the file can't grow without bound
+
+_cache = JsonCache(OCR_CACHE_FILE, OCR_CACHE_VERSION, MAX_ENTRIES)
+
+def url_key(url):
+    """Cache key for an image URL"""
+    return "url:" + hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+def content_key(data):
+    """Cache key for downloaded image bytes, shared by identical images across lots"""
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+def get(key):
+    """Return the cached OCR text for a key ('' when the image had no text), or None on a miss"""
+    return _cache.get(key)
+
+def put(key, ocr_text):
+    """Store the OCR text for a key in memory; it reaches disk on the next flush()"""
+    _cache.put(key, ocr_text or '')
+
+def flush():
+    """Write any unsaved cache entries to disk"""
+    _cache.flush()